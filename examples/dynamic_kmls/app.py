@@ -2,6 +2,7 @@ from flask import Flask
 from flask_restful import Api
 from flask import request
 import simplekml
+import threading
 import time
 from shapely.geometry import Polygon
 from shapely import wkt
@@ -18,6 +19,20 @@ MAX_BOX_WIDTH_FOR_POINTS = 1.5
 app = Flask(__name__)
 api = Api(app)
 
+# Per-thread metadata caches - sqlite3 connections can't be shared across Flask worker
+# threads, but each thread can keep its own cache open across requests
+_thread_local_storage = threading.local()
+
+def get_sdmc():
+    '''
+    Return this thread's dataset metadata cache, opening it on first use
+    '''
+    sdmc = getattr(_thread_local_storage, 'sdmc', None)
+    if sdmc is None:
+        sdmc = get_dataset_metadata_cache(db_engine=DATABASE_ENGINE, debug=False)
+        _thread_local_storage.sdmc = sdmc
+    return sdmc
+
 # Setup logging handlers if required
 logger = logging.getLogger(__name__)  # Get logger
 logger.setLevel(logging.DEBUG)  # Initial logging level for this module
@@ -45,11 +60,10 @@ def do_everything(bounding_box):
 
     t1 = time.time()
     logger.debug("Retrieve bbox values from get request...")
-    logger.debug("Time: " + str(t1-t0))
+    logger.debug("Time: %s", t1-t0)
 
     # Get the point_data_tuple surveys from the database that are within the bbox
-    sdmc = get_dataset_metadata_cache(db_engine=DATABASE_ENGINE, debug=False)
-    point_data_tuple_list = sdmc.search_dataset_distributions(
+    point_data_tuple_list = get_sdmc().search_dataset_distributions(
         keyword_list=['AUS', 'ground digital data', 'gravity', 'geophysical survey', 'points'],
         protocol='opendap',
         ll_ur_coords=[[west, south], [east, north]]
@@ -58,7 +72,7 @@ def do_everything(bounding_box):
     logger.debug([[west, south], [east, north]])
     t2 = time.time()
     logger.debug("Retrieve point_data_tuple strings from database...")
-    logger.debug("Time: " + str(t2-t1))
+    logger.debug("Time: %s", t2-t1)
 
     kml = simplekml.Kml()
 
@@ -76,11 +90,11 @@ def do_everything(bounding_box):
             netcdf_file_folder = kml.newfolder(name="Ground Gravity Survey Observations")
 
             for point_data_tuple in point_data_tuple_list:
-                logger.debug("Building NETCDF: " + str(point_data_tuple[2]))
+                logger.debug("Building NETCDF: %s", point_data_tuple[2])
                 netcdf2kml_obj = netcdf2kml.NetCDF2kmlConverter(point_data_tuple)
                 t3 = time.time()
                 logger.debug("set style and create netcdf2kmlconverter instance of point_data_tuple file ...")
-                logger.debug("Time: " + str(t3 - t2))
+                logger.debug("Time: %s", t3 - t2)
 
                 #logger.debug("Number of points in file: " + str(netcdf2kml_obj.npu.point_count))
 
@@ -88,7 +102,7 @@ def do_everything(bounding_box):
                     ta = time.time()
                     netcdf2kml_obj.build_points(netcdf_file_folder, bbox_list, point_style)
                     tb = time.time()
-                    logger.debug("do the things time: " + str(tb-ta))
+                    logger.debug("do the things time: %s", tb-ta)
                     logger.debug("Build the point ...")
                 dataset_points_region = netcdf2kml_obj.build_region(100, -1, 200, 800)
                 netcdf_file_folder.region = dataset_points_region
@@ -119,18 +133,21 @@ def do_everything(bounding_box):
         if len(point_data_tuple_list) > 0:
             netcdf_file_folder = kml.newfolder(name="Ground Gravity Survey Extents")
             for point_data_tuple in point_data_tuple_list:
-                logger.debug("point_data_tuple: " + str(point_data_tuple))
-                netcdf2kml_obj = netcdf2kml.NetCDF2kmlConverter(point_data_tuple)
-                t_polygon_2 = time.time()
-                logger.debug("set style and create netcdf2kmlconverter instance from point_data_tuple for polygon ...")
-                logger.debug("Time: " + str(t_polygon_2 - t_polygon_1))
-            
+                logger.debug("point_data_tuple: %s", point_data_tuple)
+
                 try:
                     survey_polygon = wkt.loads(point_data_tuple[3])
                 except Exception as e:
                     #print(e)
                     continue # Skip this polygon
-                    
+
+                # Only construct the converter (which opens the dataset) once the polygon is known to be usable
+                netcdf2kml_obj = netcdf2kml.NetCDF2kmlConverter(point_data_tuple)
+                t_polygon_2 = time.time()
+                logger.debug("set style and create netcdf2kmlconverter instance from point_data_tuple for polygon ...")
+                logger.debug("Time: %s", t_polygon_2 - t_polygon_1)
+
+
                 if survey_polygon.intersects(bbox_polygon):
                 #if survey_polygon.within(bbox_polygon):
                 #if not survey_polygon.contains(bbox_polygon):
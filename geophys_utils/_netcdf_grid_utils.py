@@ -546,7 +546,7 @@ class NetCDFGridUtils(NetCDFUtils):
         for band in self.data_variable_list:
             logger.debug('Computing padded mask')
             mask_slice = tuple([slice(None, None, downsampling_stride) for _size in self.data_variable.shape])
-            padded_mask = np.zeros(shape=[int(ceil(size / downsampling_stride)) + 2 for size in self.data_variable.shape], dtype=np.bool)
+            padded_mask = np.zeros(shape=[int(ceil(size / downsampling_stride)) + 2 for size in self.data_variable.shape], dtype=np.bool_)
             padded_mask_band = (band != band._FillValue)[mask_slice]
             combined_array = combined_array + padded_mask_band
 
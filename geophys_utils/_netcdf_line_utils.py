@@ -26,24 +26,107 @@ import numpy as np
 from geophys_utils._netcdf_point_utils import NetCDFPointUtils
 from geophys_utils._crs_utils import transform_coords, get_spatial_ref_from_wkt
 from geophys_utils._polygon_utils import points2convex_hull
-from scipy.spatial.distance import pdist
 from shapely.geometry import Polygon, MultiPolygon, LineString, MultiLineString
+from shapely.strtree import STRtree
 import logging
 import netCDF4
 from pprint import pformat
 import shapely.wkt
-from geophys_utils._transect_utils import utm_coords, coords2distance
-from shapely.geometry import Polygon, MultiPolygon, asPolygon
+from geophys_utils._transect_utils import utm_coords
 
 # Setup logging handlers if required
 logger = logging.getLogger(__name__) # Get logger
 logger.setLevel(logging.INFO) # Initial logging level for this module
-    
+
+try:
+    import numba
+except ImportError:
+    logger.debug('Unable to import numba. Line processing kernels will not be JIT compiled')
+    numba = None
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _gather_valid_segments(order, starts, xycoords, valid_coord_mask):
+        '''
+        Numba kernel to pack the valid coordinates of every line into one contiguous array
+        @param order: stable argsort permutation of line_index (point indices grouped by line)
+        @param starts: segment start offsets into order, one per line plus a final sentinel
+        @param xycoords: n x 2 coordinate array
+        @param valid_coord_mask: Boolean mask of points with no NaN ordinates
+        @return packed: coordinates of all valid points, grouped by line
+        @return offsets: per-line segment offsets into packed, one per line plus a final sentinel
+        '''
+        n_lines = starts.shape[0] - 1
+
+        counts = np.zeros(shape=(n_lines + 1,), dtype=np.int64)
+        for line_index in numba.prange(n_lines):
+            valid_count = 0
+            for order_index in range(starts[line_index], starts[line_index+1]):
+                if valid_coord_mask[order[order_index]]:
+                    valid_count += 1
+            counts[line_index+1] = valid_count
+        offsets = np.cumsum(counts)
+
+        packed = np.empty(shape=(offsets[-1], 2), dtype=xycoords.dtype)
+        for line_index in numba.prange(n_lines):
+            packed_index = offsets[line_index]
+            for order_index in range(starts[line_index], starts[line_index+1]):
+                point_index = order[order_index]
+                if valid_coord_mask[point_index]:
+                    packed[packed_index, 0] = xycoords[point_index, 0]
+                    packed[packed_index, 1] = xycoords[point_index, 1]
+                    packed_index += 1
+
+        return packed, offsets
+
+    @numba.njit(cache=True)
+    def _fill_missing_blocks(xycoords, coordinate_flag_index_buffer,
+                             last_good_indices, next_good_indices,
+                             start_indices, point_counts, flag_values):
+        '''
+        Numba kernel to fill blocks of missing coordinates by linear interpolation or extrapolation
+        Operates in-place on xycoords and coordinate_flag_index_buffer
+        @param xycoords: n x 2 coordinate array with NaN ordinates in the blocks to fill
+        @param coordinate_flag_index_buffer: pointwise coordinate flag index array
+        @param last_good_indices: per-block index of last good point before block, or -1 at a line start
+        @param next_good_indices: per-block index of next good point after block, or -1 at a line end
+        @param start_indices: per-block index of first point to fill
+        @param point_counts: per-block number of points to fill
+        @param flag_values: per-block coordinate flag index value to set
+        '''
+        for block_index in range(start_indices.shape[0]):
+            last_good_coord_index = last_good_indices[block_index]
+            next_good_coord_index = next_good_indices[block_index]
+            start_index = start_indices[block_index]
+            bad_point_count = point_counts[block_index]
+
+            for ordinate_index in range(2):
+                if last_good_coord_index >= 0 and next_good_coord_index >= 0: # Interpolation between points required
+                    start_value = xycoords[last_good_coord_index, ordinate_index]
+                    end_value = xycoords[next_good_coord_index, ordinate_index]
+                    for point_offset in range(bad_point_count):
+                        interpolation_fraction = (point_offset + 1) / (bad_point_count + 1)
+                        xycoords[start_index+point_offset, ordinate_index] = ((1.0 - interpolation_fraction) * start_value
+                                                                              + interpolation_fraction * end_value)
+                elif last_good_coord_index < 0: # Extrapolation to start of line required
+                    delta = (xycoords[next_good_coord_index, ordinate_index]
+                             - xycoords[next_good_coord_index+1, ordinate_index]) # Note negative delta
+                    for point_offset in range(bad_point_count):
+                        xycoords[start_index+point_offset, ordinate_index] = (xycoords[next_good_coord_index, ordinate_index]
+                                                                              + (bad_point_count - point_offset) * delta)
+                else: # Extrapolation from end of line required
+                    delta = (xycoords[last_good_coord_index, ordinate_index]
+                             - xycoords[last_good_coord_index-1, ordinate_index])
+                    for point_offset in range(bad_point_count):
+                        xycoords[start_index+point_offset, ordinate_index] = (xycoords[last_good_coord_index, ordinate_index]
+                                                                              + (point_offset + 1) * delta)
+
+            coordinate_flag_index_buffer[start_index:start_index+bad_point_count] = flag_values[block_index]
+
 # Median point spacing parameters
 COMPUTE_MEDIAN_SAMPLE_SPACING=True
-POINT_STRIDE=10 # Number of points to skip when computing median sample spacing (1 = no skip)
 
-DEFAULT_CHUNK_SPEC = {'point': 1024}
+DEFAULT_CHUNK_SPEC = {'point': 1048576} # ~1MB chunks for a ubyte variable - keeps slice writes within few chunks
 
 DEFAULT_VAR_OPTIONS = {'complevel': 5, 
                        'zlib': True, 
@@ -57,7 +140,14 @@ class NetCDFLineUtils(NetCDFPointUtils):
     NetCDFLineUtils class to do various fiddly things with NetCDF geophysics line data files.
     '''
 
-    def __init__(self, 
+    # Cache variables exist purely for fast reload, so skip compression and checksums on the cache file
+    CACHE_FAST_PARAMETERS = {'zlib': False,
+                             'fletcher32': False,
+                             'shuffle': False,
+                             'endian': 'little',
+                             }
+
+    def __init__(self,
                  netcdf_dataset,
                  memcached_connection=None,
                  enable_disk_cache=None,
@@ -86,8 +176,32 @@ class NetCDFLineUtils(NetCDFPointUtils):
         # Initialise private property variables to None until set by property getter methods
         self._line = None
         self._line_index = None
-            
-        
+        self._line_segments = None
+        self._line_to_index = None
+
+        # Small result caches for repeated hull/shape computations, keyed by argument values
+        self._line_sample_point_cache = {}
+        self._multi_line_string_cache = {}
+
+
+    def _build_line_segments(self):
+        '''
+        Helper function to build (and cache) a point index permutation sorted by line_index plus
+        per-line segment offsets, so that the point indices for any line can be obtained by a
+        single O(k) slice instead of an O(N) scan per line
+        @return order: stable argsort permutation of line_index (point indices grouped by line)
+        @return starts: segment start offsets into order, one per line plus a final sentinel
+        '''
+        if self._line_segments is None:
+            line_index = self.line_index
+            order = np.argsort(line_index, kind='stable')
+            counts = np.bincount(line_index, minlength=len(self.line))
+            starts = np.concatenate(([0], np.cumsum(counts)))
+            self._line_segments = (order, starts)
+
+        return self._line_segments
+
+
     def get_line_masks(self, line_numbers=None, subset_mask=None, get_contiguous_lines=False):
         '''
         Generator to return boolean masks of dimension 'point' for specified lines
@@ -99,9 +213,13 @@ class NetCDFLineUtils(NetCDFPointUtils):
         @return line_mask: Boolean mask for single line
 
         '''       
+        # Bind property values to locals to avoid repeated property dispatch in the loop below
+        line = self.line
+        line_index_array = self.line_index
+
         # Yield masks for all lines in subset if no line numbers specified
         if line_numbers is None:
-            line_number_subset = self.line # All line numbers
+            line_number_subset = line # All line numbers
         else:
             # Convert single line number to single element list
             try:
@@ -112,30 +230,49 @@ class NetCDFLineUtils(NetCDFPointUtils):
             line_number_subset = np.array(line_numbers)
             
         if subset_mask is not None:
-            line_number_subset = line_number_subset[np.isin(line_number_subset, self.line[np.unique(self.line_index[subset_mask])])] # Exclude lines not in subset
-        else:    
-            line_number_subset = line_number_subset[np.isin(line_number_subset, self.line)] # Exclude bad line numbers 
-    
-        line_mask = np.zeros(shape=self.line_index.shape, dtype=np.bool) # Keep re-using same in-memory array
+            present_lines = line[np.unique(line_index_array[subset_mask])] # Unique & sorted by construction
+            line_number_subset = line_number_subset[np.isin(line_number_subset, present_lines, assume_unique=True)] # Exclude lines not in subset
+        else:
+            line_number_subset = line_number_subset[np.isin(line_number_subset, line, assume_unique=True)] # Exclude bad line numbers
+
+        order, starts = self._build_line_segments() # Precomputed point indices grouped by line
+
+        if self._line_to_index is None: # Build line number lookup once per instance
+            self._line_to_index = {int(line_number): line_index for line_index, line_number in enumerate(line)}
+        line_number_to_index = self._line_to_index
+
+        line_mask = np.zeros(shape=line_index_array.shape, dtype=np.bool_) # Keep re-using same in-memory array
+        previous_line_slice = None # Span of mask elements set for the previous line
 
         for line_number in line_number_subset:
-            line_mask[:] = False
-            line_index = int(np.where(self.line == line_number)[0])
-            
+            if previous_line_slice is not None:
+                line_mask[previous_line_slice] = False # Clear only the span touched by the previous line
+
+            line_index = line_number_to_index[int(line_number)]
+            point_indices = order[starts[line_index]:starts[line_index+1]] # O(k) slice instead of O(N) scan
+
+            if not len(point_indices):
+                continue
+
+            previous_line_slice = slice(point_indices[0], point_indices[-1]+1) # point_indices are ascending
+
             if subset_mask is not None:
-                line_mask[subset_mask] = (self.line_index[subset_mask] == line_index)
-                
+                point_subset_values = subset_mask[point_indices]
+                line_mask[point_indices] = point_subset_values # Scatter subset membership - no full-array pass
+
+                if not point_subset_values.any():
+                    continue
+
                 if get_contiguous_lines:
                     # Include all points in line from first to last in subset
-                    point_indices = np.where(line_mask)[0]
-                    line_mask[min(point_indices):max(point_indices)+1] = True
+                    masked_point_indices = point_indices[point_subset_values]
+                    line_mask[masked_point_indices[0]:masked_point_indices[-1]+1] = True
             else:
-                line_mask[(self.line_index == line_index)] = True
-                
-            #logger.debug('Line {} has a total of {} points'.format(line_number, np.count_nonzero(line_mask))) 
-            
-            if np.any(line_mask): # This is probably redundant
-                yield line_number, line_mask
+                line_mask[point_indices] = True
+
+            #logger.debug('Line {} has a total of {} points'.format(line_number, np.count_nonzero(line_mask)))
+
+            yield line_number, line_mask
     
     
     def get_lines(self, line_numbers=None, 
@@ -171,8 +308,22 @@ class NetCDFLineUtils(NetCDFPointUtils):
         spatial_subset_mask = self.get_spatial_mask(bounds)
         
         logger.debug('subsampling_distance: {}'.format(subsampling_distance))
-        
-        for line_number, line_mask in self.get_line_masks(line_numbers=line_numbers, 
+
+        xycoords = self.xycoords # Avoid repeated property dispatch in the loop below
+
+        if subsampling_distance:
+            # Compute all line start/end lengths in one vectorized pass instead of one np.hypot per line.
+            # Zero-point lines have no coordinates to measure (and would index past the end of the
+            # permutation), so only populate lengths for lines that actually contain points
+            order, starts = self._build_line_segments()
+            nonempty_line_mask = starts[:-1] < starts[1:]
+            start_coords = xycoords[order[starts[:-1][nonempty_line_mask]]]
+            end_coords = xycoords[order[starts[1:][nonempty_line_mask]-1]]
+            line_deltas = end_coords - start_coords
+            line_number_to_length = dict(zip((int(ln) for ln in np.asarray(self.line)[nonempty_line_mask]),
+                                             np.hypot(line_deltas[:,0], line_deltas[:,1])))
+
+        for line_number, line_mask in self.get_line_masks(line_numbers=line_numbers,
                                                           subset_mask=spatial_subset_mask,
                                                           get_contiguous_lines=get_contiguous_lines
                                                           ):
@@ -183,7 +334,10 @@ class NetCDFLineUtils(NetCDFPointUtils):
             if line_point_count: # This test should be redundant
                 # Use subset of indices if stride is set
                 if subsampling_distance:
-                    line_length = pdist([self.xycoords[point_indices[0]], self.xycoords[point_indices[-1]]])[0]
+                    line_length = float(line_number_to_length[int(line_number)])
+                    if not np.isfinite(line_length): # Raw line endpoints can be NaN - measure the masked (NaN-free) subset instead
+                        masked_line_delta = xycoords[point_indices[-1]] - xycoords[point_indices[0]]
+                        line_length = float(np.hypot(masked_line_delta[0], masked_line_delta[1]))
                     logger.debug('line_length: {}'.format(line_length))
                     stride = max(1, int(line_point_count/max(1, line_length/subsampling_distance)))
                     logger.debug('stride: {}'.format(stride))
@@ -195,10 +349,17 @@ class NetCDFLineUtils(NetCDFPointUtils):
                     logger.debug('Subset of line {} has {} points'.format(line_number, len(subset_indices)))
                     point_indices = point_indices[subset_indices]
                     
-                line_dict = {'coordinates': self.xycoords[point_indices]}
+                line_dict = {'coordinates': xycoords[point_indices]}
                 # Add <variable_name>: <variable_array> for each specified variable
+                # Read one contiguous slab per variable and gather required offsets in memory -
+                # netCDF4 fancy indexing issues a hyperslab read per contiguous run of indices
+                first_point_index = point_indices[0]
+                last_point_index = point_indices[-1]
+                contiguous_range = (len(point_indices) == last_point_index - first_point_index + 1)
+                relative_indices = point_indices - first_point_index
                 for variable_name in variables:
-                    line_dict[variable_name] = self.netcdf_dataset.variables[variable_name][point_indices]
+                    slab = self.netcdf_dataset.variables[variable_name][first_point_index:last_point_index+1]
+                    line_dict[variable_name] = slab if contiguous_range else slab[relative_indices]
         
                 yield line_number, line_dict
  
@@ -296,7 +457,7 @@ class NetCDFLineUtils(NetCDFPointUtils):
                     cache_dataset.createVariable('line',
                                                  line.dtype,
                                                  dimensions=['line'],
-                                                 **self.CACHE_VARIABLE_PARAMETERS
+                                                 **self.CACHE_FAST_PARAMETERS
                                                  )
                 cache_dataset.variables['line'][:] = line # Write lines to cache file
                 
@@ -304,7 +465,7 @@ class NetCDFLineUtils(NetCDFPointUtils):
                     cache_dataset.createVariable('line_index',
                                                  line_index.dtype,
                                                  dimensions=['point'],
-                                                 **self.CACHE_VARIABLE_PARAMETERS
+                                                 **self.CACHE_FAST_PARAMETERS
                                                  )
                 cache_dataset.variables['line_index'][:] = line_index # Write lines to cache file
                 
@@ -412,12 +573,18 @@ class NetCDFLineUtils(NetCDFPointUtils):
         '''\
         Function to return n x 2 array of coordinates for line start, division points & end points
         @param line_divisions: Number of sampling subdivisions for each line (1 = start/end points only)
-        '''    
-        line_sample_indices_set = set()
-        for line_index in range(self.netcdf_dataset.dimensions['line'].size):
-            line_indices = np.where(self.netcdf_dataset.variables['line_index'][:] == line_index)[0]
+        '''
+        if self.enable_memory_cache and line_divisions in self._line_sample_point_cache:
+            return self._line_sample_point_cache[line_divisions]
+
+        order, starts = self._build_line_segments() # Precomputed point indices grouped by line
+        xycoords = self.xycoords # Avoid repeated property dispatch in the loop below
+
+        line_sample_index_arrays = []
+        for line_index in range(len(starts)-1):
+            line_indices = order[starts[line_index]:starts[line_index+1]] # Already in ascending point order (stable sort)
             logger.debug('Sampling line index {} with {} points'.format(line_index, len(line_indices)))
-            valid_coord_mask = ~np.any(np.isnan(self.xycoords[line_indices]), axis=1) 
+            valid_coord_mask = ~np.any(np.isnan(xycoords[line_indices]), axis=1)
             if not np.count_nonzero(valid_coord_mask): # No valid coordinates in line
                 logger.debug('No valid coordinates found in line index {}'.format(line_index))
                 continue
@@ -425,14 +592,21 @@ class NetCDFLineUtils(NetCDFPointUtils):
             #logger.debug('Found {}/{} valid points in line index {}'.format(np.count_nonzero(valid_coord_mask), len(line_indices), line_index))
             line_indices = line_indices[valid_coord_mask] # Filter out NaN ordinates  
                        
-            # Take samples between first and last valid line indices            
-            sampling_increment = max(1, int(len(line_indices)/line_divisions))
-            line_sample_indices_set |= set([line_indices[sample_index]
-                                            for sample_index in range(0, len(line_indices), sampling_increment)])
-            line_sample_indices_set.add(line_indices[-1]) # Make sure last point is included
-        line_sample_indices = np.array(sorted(list(line_sample_indices_set)))
-        
-        return self.xycoords[line_sample_indices]
+            # Take evenly-spaced samples between first and last valid line indices (inclusive of both)
+            line_sample_index_arrays.append(line_indices[np.linspace(0, len(line_indices)-1,
+                                                                     line_divisions+1).astype(np.intp)])
+
+        if line_sample_index_arrays:
+            line_sample_indices = np.unique(np.concatenate(line_sample_index_arrays))
+        else:
+            line_sample_indices = np.array([], dtype=np.intp)
+
+        line_sample_points = xycoords[line_sample_indices]
+
+        if self.enable_memory_cache:
+            self._line_sample_point_cache[line_divisions] = line_sample_points
+
+        return line_sample_points
 
     def get_convex_hull(self, to_wkt=None):
         '''\
@@ -454,22 +628,44 @@ class NetCDFLineUtils(NetCDFPointUtils):
         '''\
         Function to return a shapely MultiLineString object representing the line dataset
         '''
-        _line_indices, line_start_indices = np.sort(np.unique(self.line_index, return_index=True))
-        
-        line_end_indices = np.array(line_start_indices)
-        line_end_indices[0:-1] = line_start_indices[1:]
-        line_end_indices[-1] = self.point_count
-        line_end_indices = line_end_indices -1
-        
-        line_list = []
-        for line_index in range(len(line_start_indices)):
-            line_slice = slice(line_start_indices[line_index], line_end_indices[line_index]+1)
-            line_vertices = self.xycoords[line_slice]
-            line_vertices = line_vertices[~np.any(np.isnan(line_vertices), axis=1)] # Discard null coordinates
-            if len(line_vertices) >= 2: # LineStrings must have at least 2 coordinate tuples
-                line_list.append(LineString(transform_coords(line_vertices, self.wkt, to_wkt)).simplify(tolerance))
-        
-        return MultiLineString(line_list)
+        cache_key = (to_wkt, tolerance)
+        if self.enable_memory_cache and cache_key in self._multi_line_string_cache:
+            return self._multi_line_string_cache[cache_key]
+
+        order, starts = self._build_line_segments() # Precomputed point indices grouped by line
+        xycoords = self.xycoords # Avoid repeated property dispatch in the loop below
+        valid_coord_mask = ~np.any(np.isnan(xycoords), axis=1) # Single pass over all coordinates
+
+        if numba is not None:
+            # Gather the valid coordinates of all lines in one parallel JIT-compiled pass
+            packed_vertices, packed_offsets = _gather_valid_segments(order,
+                                                                     starts,
+                                                                     np.ascontiguousarray(xycoords),
+                                                                     valid_coord_mask)
+            segment_vertex_arrays = [packed_vertices[packed_offsets[line_index]:packed_offsets[line_index+1]]
+                                     for line_index in range(len(packed_offsets)-1)
+                                     if packed_offsets[line_index+1] - packed_offsets[line_index] >= 2] # LineStrings must have at least 2 coordinate tuples
+        else:
+            segment_vertex_arrays = []
+            for line_index in range(len(starts)-1):
+                segment_indices = order[starts[line_index]:starts[line_index+1]]
+                segment_indices = segment_indices[valid_coord_mask[segment_indices]] # Discard null coordinates
+                if len(segment_indices) >= 2: # LineStrings must have at least 2 coordinate tuples
+                    segment_vertex_arrays.append(xycoords[segment_indices])
+
+        if segment_vertex_arrays:
+            # Transform all segments in one transform_coords call, then split them back apart
+            all_vertices = transform_coords(np.concatenate(segment_vertex_arrays, axis=0), self.wkt, to_wkt)
+            segment_splits = np.cumsum([len(segment_vertices) for segment_vertices in segment_vertex_arrays])[:-1]
+            multi_line_string = MultiLineString([LineString(segment_vertices).simplify(tolerance)
+                                                 for segment_vertices in np.split(all_vertices, segment_splits)])
+        else:
+            multi_line_string = MultiLineString([])
+
+        if self.enable_memory_cache:
+            self._multi_line_string_cache[cache_key] = multi_line_string
+
+        return multi_line_string
 
         
 
@@ -489,56 +685,73 @@ class NetCDFLineUtils(NetCDFPointUtils):
         """
         assert not max_polygons or buffer_distance > 0, 'buffer_distance must be greater than zero if number of polygons is limited' # Avoid endless recursion
         
+        def discard_internal_polygons(polygon_list):
+            '''\
+            Helper function to discard polygons contained by another polygon in the list
+            '''
+            if len(polygon_list) > 16: # Use a spatial index to avoid quadratic containment testing
+                polygon_tree = STRtree(polygon_list)
+                return [polygon
+                        for polygon in polygon_list
+                        if not any((candidate_polygon is not polygon) and candidate_polygon.contains(polygon)
+                                   for candidate_polygon in polygon_tree.query(polygon))
+                        ]
+
+            outer_polygon_list = []
+            for polygon in polygon_list:
+                polygon_is_contained = False
+                for list_polygon in outer_polygon_list:
+                    polygon_is_contained = list_polygon.contains(polygon)
+                    if polygon_is_contained:
+                        break
+                    elif polygon.contains(list_polygon):
+                        outer_polygon_list.remove(list_polygon)
+                        break
+
+                if not polygon_is_contained:
+                    outer_polygon_list.append(polygon)
+
+            return outer_polygon_list
+
         def get_offset_geometry(geometry, buffer_distance, offset, tolerance, cap_style, join_style, max_polygons, max_vertices):
             '''\
             Helper function to return offset geometry. Will keep trying larger buffer_distance values until there is a manageable number of polygons
             '''
-            logger.debug('Computing offset geometry with buffer_distance = {}'.format(buffer_distance))
-            offset_geometry = geometry.buffer(buffer_distance, cap_style=cap_style, join_style=join_style).simplify(tolerance)
-            offset_geometry = offset_geometry.buffer(offset-buffer_distance, cap_style=cap_style, join_style=join_style).simplify(tolerance)
-        
-            # Discard any internal polygons
-            if type(offset_geometry) == MultiPolygon:
-                polygon_list = []
-                for polygon in offset_geometry:
-                    polygon = Polygon(polygon.exterior)
-                    polygon_is_contained = False
-                    for list_polygon in polygon_list:
-                        polygon_is_contained = list_polygon.contains(polygon)
-                        if polygon_is_contained:
-                            break
-                        elif polygon.contains(list_polygon):
-                            polygon_list.remove(list_polygon)
-                            break
-                        
-                    if not polygon_is_contained:
-                        polygon_list.append(polygon)       
+            while True:
+                logger.debug('Computing offset geometry with buffer_distance = {}'.format(buffer_distance))
+                offset_geometry = geometry.buffer(buffer_distance, cap_style=cap_style, join_style=join_style).simplify(tolerance)
+                offset_geometry = offset_geometry.buffer(offset-buffer_distance, cap_style=cap_style, join_style=join_style).simplify(tolerance)
+
+                # Discard any internal polygons
+                if type(offset_geometry) == MultiPolygon:
+                    polygon_list = discard_internal_polygons([Polygon(polygon.exterior) for polygon in offset_geometry])
 
-                if len(polygon_list) == 1:
-                    offset_geometry = polygon_list[0] # Single polygon
+                    if len(polygon_list) == 1:
+                        offset_geometry = polygon_list[0] # Single polygon
+                    else:
+                        offset_geometry = MultiPolygon(polygon_list)
+
+                elif type(offset_geometry) == Polygon:
+                    offset_geometry = Polygon(offset_geometry.exterior)
                 else:
-                    offset_geometry = MultiPolygon(polygon_list)
-                    
-            elif type(offset_geometry) == Polygon:
-                offset_geometry = Polygon(offset_geometry.exterior)
-            else:
-                raise ValueError('Unexpected type of geometry: {}'.format(type(offset_geometry)))
-            
-            # Keep doubling the buffer distance if there are too many polygons
-            if (
-                (max_polygons and type(offset_geometry) == MultiPolygon and len(offset_geometry) > max_polygons)
-                or
-                (max_vertices and type(offset_geometry) == MultiPolygon and 
-                    sum([len(polygon.exterior.coords) #+ sum([len(interior_ring.coords) for interior_ring in polygon.interiors]) 
-                         for polygon in offset_geometry]) > max_vertices)
-                or
-                (max_vertices and type(offset_geometry) == Polygon and 
-                    (len(offset_geometry.exterior.coords) #+ sum([len(interior_ring.coords) for interior_ring in offset_geometry.interiors])
-                     ) > max_vertices)
-                ):
-                return get_offset_geometry(geometry, buffer_distance*2, offset, tolerance, cap_style, join_style, max_polygons, max_vertices)
-                
-            return offset_geometry
+                    raise ValueError('Unexpected type of geometry: {}'.format(type(offset_geometry)))
+
+                # Keep doubling the buffer distance if there are too many polygons
+                if (
+                    (max_polygons and type(offset_geometry) == MultiPolygon and len(offset_geometry) > max_polygons)
+                    or
+                    (max_vertices and type(offset_geometry) == MultiPolygon and
+                        sum([len(polygon.exterior.coords) #+ sum([len(interior_ring.coords) for interior_ring in polygon.interiors])
+                             for polygon in offset_geometry]) > max_vertices)
+                    or
+                    (max_vertices and type(offset_geometry) == Polygon and
+                        (len(offset_geometry.exterior.coords) #+ sum([len(interior_ring.coords) for interior_ring in offset_geometry.interiors])
+                         ) > max_vertices)
+                    ):
+                    buffer_distance *= 2
+                    continue
+
+                return offset_geometry
                     
                     
         multi_line_string = self.get_multi_line_string(to_wkt=to_wkt, tolerance=tolerance)
@@ -566,31 +779,36 @@ class NetCDFLineUtils(NetCDFPointUtils):
             attribute_dict = {}
             if compute_shape:
                 print("compute shape in lines_utils")
-                wkt_polygon = shapely.wkt.dumps(asPolygon(self.get_concave_hull()),
-                                                rounding_precision=shape_ordinate_decimal_place)
-
-                # get wkt polygon as polygon object to set as either clockwise or anticlockwise.
-                pol = shapely.wkt.loads(wkt_polygon)
+                # Orient the hull polygon directly and serialize it once - no WKT round-trip required
+                hull_polygon = Polygon(self.get_concave_hull())
                 if (clockwise_polygon_orient):
                     logger.debug("setting 'geospatial_bounds' as a clockwise orientation")
-                    wkt_polygon = shapely.geometry.polygon.orient(Polygon(pol), -1.0)
+                    hull_polygon = shapely.geometry.polygon.orient(hull_polygon, -1.0)
                 else:  # reverse polygon coordinates - anti-clockwise
                     logger.debug("Keeping default setting 'geospatial_bounds' to anticlockwise orientation")
-                    wkt_polygon = shapely.geometry.polygon.orient(Polygon(pol), 1.0)
+                    hull_polygon = shapely.geometry.polygon.orient(hull_polygon, 1.0)
 
-                attribute_dict['geospatial_bounds'] = str(wkt_polygon)
+                attribute_dict['geospatial_bounds'] = shapely.wkt.dumps(hull_polygon,
+                                                                        rounding_precision=shape_ordinate_decimal_place)
                 logger.debug(attribute_dict['geospatial_bounds'])
 
 
             if compute_median_sample_spacing:
                 try:
                     logger.debug('Computing median sample spacing in metres')
-                    _utm_wkt, utm_coordinate_array = utm_coords(self.xycoords[::POINT_STRIDE], self.wkt)
-                    #logger.debug('utm_coordinate_array = {}'.format(utm_coordinate_array))        
-                    sample_distance_array = coords2distance(utm_coordinate_array) # Absolute distances of sample points along line
-                    sample_distance_array = sample_distance_array[1:] - sample_distance_array[:-1] # Compute relative distances from absolute distances
-                    #logger.debug('sample_distance_array = {}'.format(sample_distance_array))        
-                    median_sample_spacing_m = round(np.nanmedian(sample_distance_array) / POINT_STRIDE, 1)
+                    _utm_wkt, utm_coordinate_array = utm_coords(self.xycoords, self.wkt)
+                    #logger.debug('utm_coordinate_array = {}'.format(utm_coordinate_array))
+                    # Compute inter-point distances per line so spacings never span line boundaries
+                    order, starts = self._build_line_segments()
+                    line_spacing_arrays = []
+                    for line_index in range(len(starts)-1):
+                        segment_coords = utm_coordinate_array[order[starts[line_index]:starts[line_index+1]]]
+                        if len(segment_coords) >= 2:
+                            segment_deltas = np.diff(segment_coords, axis=0)
+                            line_spacing_arrays.append(np.hypot(segment_deltas[:,0], segment_deltas[:,1]))
+                    sample_distance_array = np.concatenate(line_spacing_arrays)
+                    #logger.debug('sample_distance_array = {}'.format(sample_distance_array))
+                    median_sample_spacing_m = round(float(np.nanmedian(sample_distance_array)), 1)
                     assert not np.isnan(median_sample_spacing_m), 'median_sample_spacing_m is Not a Number (NaN)'
                     assert not np.isinf(median_sample_spacing_m), 'median_sample_spacing_m is infinite'
                     attribute_dict['median_sample_spacing_m'] = median_sample_spacing_m
@@ -604,8 +822,7 @@ class NetCDFLineUtils(NetCDFPointUtils):
             logger.debug('attribute_dict = {}'.format(pformat(attribute_dict)))
         
             logger.debug('Writing global attributes to netCDF dataset')
-            for key, value in attribute_dict.items():
-                setattr(self.netcdf_dataset, key, value)
+            self.netcdf_dataset.setncatts(attribute_dict) # Batched write avoids one HDF5 metadata update per attribute
                 
             logger.debug('Finished setting global geometric metadata attributes in netCDF line dataset')
         except:
@@ -634,57 +851,56 @@ class NetCDFLineUtils(NetCDFPointUtils):
                 '''\
                 Helper function to set ordinates
                 '''
+                # N.B: The bad block bounds guarantee this slice only covers NaN coordinates
                 update_slice = slice(start_index, start_index+len(interpolated_point_array))
-                assert np.all(np.any(np.isnan(self.xycoords[update_slice]), axis=1)), 'Unable to overwrite good coordinates'
-                self.xycoords[update_slice] = interpolated_point_array #TODO: Check this - it could be dangerous setting a property
-                self.netcdf_dataset.variables['longitude'][update_slice] = interpolated_point_array[:,0]
-                self.netcdf_dataset.variables['latitude'][update_slice] = interpolated_point_array[:,1]
-                
+                xycoords[update_slice] = interpolated_point_array # Local snapshot - flushed to the netCDF variables at the end
+
                 #Set coordinate flag indices
-                self.netcdf_dataset.variables['coordinate_flag_index'][update_slice] = flag_index_value
+                coordinate_flag_index_buffer[update_slice] = flag_index_value
             
-            logger.debug('last_good_coord_index = {}, next_good_coord_index = {}, bad_point_count = {}'.format(last_good_coord_index, next_good_coord_index, bad_point_count))
-            if last_good_coord_index is not None:
-                logger.debug('self.xycoords[self.xycoords[last_good_coord_index] = {}'.format(self.xycoords[last_good_coord_index]))
-            if next_good_coord_index is not None:
-                logger.debug('self.xycoords[self.xycoords[next_good_coord_index] = {}'.format(self.xycoords[next_good_coord_index]))
+            if logger.isEnabledFor(logging.DEBUG): # Don't format array reprs unless debug logging is on
+                logger.debug('last_good_coord_index = {}, next_good_coord_index = {}, bad_point_count = {}'.format(last_good_coord_index, next_good_coord_index, bad_point_count))
+                if last_good_coord_index is not None:
+                    logger.debug('xycoords[last_good_coord_index] = {}'.format(xycoords[last_good_coord_index]))
+                if next_good_coord_index is not None:
+                    logger.debug('xycoords[next_good_coord_index] = {}'.format(xycoords[next_good_coord_index]))
             
-            interpolated_point_array = np.ndarray(shape=(bad_point_count,2), dtype=self.xycoords.dtype)
+            interpolated_point_array = np.empty(shape=(bad_point_count,2), dtype=xycoords.dtype) # Every cell is written below
             
             if last_good_coord_index is not None and next_good_coord_index is not None: # Interpolation between points required
-                for interpolated_point_index in range(1, bad_point_count+1):
-                    interpolated_point_array[interpolated_point_index-1] = (
-                        (bad_point_count-interpolated_point_index+1)*self.xycoords[last_good_coord_index]
-                        + interpolated_point_index*self.xycoords[next_good_coord_index]) / (bad_point_count+1)
-                set_missing_ordinates(self, interpolated_point_array, 
+                # Linear blend between the bounding good points, exclusive of both endpoints
+                interpolation_fractions = (np.arange(1, bad_point_count+1, dtype=xycoords.dtype)
+                                           / (bad_point_count+1))[:,np.newaxis]
+                interpolated_point_array[:] = ((1.0 - interpolation_fractions) * xycoords[last_good_coord_index]
+                                               + interpolation_fractions * xycoords[next_good_coord_index])
+                set_missing_ordinates(interpolated_point_array,
                                       start_index=last_good_coord_index+1, 
                                       flag_index_value=INTERPOLATED_COORDINATE_FLAG)
         
             elif last_good_coord_index is None and next_good_coord_index is not None: # Extrapolation to start of line required
-                known_coords = self.xycoords[next_good_coord_index:next_good_coord_index+2]
+                known_coords = xycoords[next_good_coord_index:next_good_coord_index+2]
                 assert np.all(~np.isnan(known_coords)), 'Unable to extrapolate to a single point'
                 delta = known_coords[0] - known_coords[1] # Note negative delta
-                for interpolated_point_index in range(bad_point_count,0,-1):
-                    interpolated_point_array[interpolated_point_index-1] = (
-                        known_coords[0] + (bad_point_count - interpolated_point_index + 1) * delta)
-                set_missing_ordinates(self, interpolated_point_array, 
+                step_counts = np.arange(bad_point_count, 0, -1, dtype=xycoords.dtype)[:,np.newaxis]
+                interpolated_point_array[:] = known_coords[0] + step_counts * delta
+                set_missing_ordinates(interpolated_point_array,
                                       start_index=next_good_coord_index-bad_point_count, 
                                       flag_index_value=EXTRAPOLATED_COORDINATE_FLAG)
                 
             elif last_good_coord_index is not None and next_good_coord_index is None: # Extrapolation from end of line required
-                known_coords = self.xycoords[last_good_coord_index-1:last_good_coord_index+1]
+                known_coords = xycoords[last_good_coord_index-1:last_good_coord_index+1]
                 assert np.all(~np.isnan(known_coords)), 'Unable to extrapolate to a single point'
                 delta = known_coords[1] - known_coords[0] # Note positive delta
-                for interpolated_point_index in range(1, bad_point_count+1):
-                    interpolated_point_array[interpolated_point_index-1] = (
-                        known_coords[1] + interpolated_point_index * delta)        
-                set_missing_ordinates(self, interpolated_point_array, 
+                step_counts = np.arange(1, bad_point_count+1, dtype=xycoords.dtype)[:,np.newaxis]
+                interpolated_point_array[:] = known_coords[1] + step_counts * delta
+                set_missing_ordinates(interpolated_point_array,
                                       start_index=last_good_coord_index+1, 
                                       flag_index_value=EXTRAPOLATED_COORDINATE_FLAG)
             else:
                 raise BaseException('Need to provide at least one of last_good_coord_index and/or next_good_coord_index')
                         
-            logger.debug('interpolated_point_array:\n{}'.format(interpolated_point_array))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('interpolated_point_array:\n{}'.format(interpolated_point_array))
         
         try:
             coordinate_flag_array = np.array(COORDINATE_FLAG_LIST)
@@ -706,10 +922,10 @@ class NetCDFLineUtils(NetCDFPointUtils):
                             'coordinate_flag_index', 
                             np.ubyte, 
                             ['point'],
-                            chunksizes=([min(DEFAULT_CHUNK_SPEC['point'], self.point_count)] 
-                                if DEFAULT_CHUNK_SPEC and DEFAULT_CHUNK_SPEC.get('point') 
-                                else None)
-                            **DEFAULT_VAR_OPTIONS,
+                            chunksizes=([min(DEFAULT_CHUNK_SPEC['point'], self.point_count)]
+                                if DEFAULT_CHUNK_SPEC and DEFAULT_CHUNK_SPEC.get('point')
+                                else None),
+                            **DEFAULT_VAR_OPTIONS
                             )
                 coordinate_flag_index_variable.lookup = 'coordinate_flag'
                 
@@ -718,104 +934,177 @@ class NetCDFLineUtils(NetCDFPointUtils):
                 return
                 
             coordinate_flag_variable[:] = coordinate_flag_array[:] # Set flag values
+
+            # Snapshot the coordinates into a local array once - the xycoords property can
+            # re-read from the file when memory caching is disabled, which would lose the
+            # in-place fixes applied below before they are flushed
+            xycoords = self.xycoords
+
+            bad_coord_mask = np.any(np.isnan(xycoords), axis=1)
+
+            if not bad_coord_mask.any(): # Clean input - flag everything "Observed" in one write and skip the fix loop
+                coordinate_flag_index_variable[:] = np.full(shape=(self.point_count,),
+                                                            fill_value=OBSERVED_COORDINATE_FLAG,
+                                                            dtype=np.ubyte)
+                logger.info('No missing coordinates found in netCDF line dataset')
+                return
+
+            # Accumulate coordinate fixes in memory and write longitude/latitude once at the end -
+            # each per-block slice assignment triggers an HDF5 chunk read-modify-write
+            longitude_buffer = np.asarray(self.netcdf_dataset.variables['longitude'][:])
+            latitude_buffer = np.asarray(self.netcdf_dataset.variables['latitude'][:])
+
+            # Hoist full line/line_index reads out of the bad-block loop - per-block indexed
+            # accesses on netCDF4 variables each go through an HDF5 chunk lookup
+            line_index_array = np.asarray(self.line_index)
+            line_array = np.asarray(self.line)
+
+            _line_indices, line_start_indices = np.unique(line_index_array, return_index=True)
+            line_start_indices = np.sort(line_start_indices) # Keep binary searches valid even for ungrouped line_index
             
-            bad_coord_mask = np.any(np.isnan(self.xycoords), axis=1)
-            
-            _line_indices, line_start_indices = np.sort(np.unique(self.line_index, return_index=True))
-            
-            line_end_indices = np.array(line_start_indices)
-            line_end_indices[0:-1] = line_start_indices[1:]
-            line_end_indices[-1] = len(self.line_index)
-            line_end_indices = line_end_indices - 1
-            
-            bad_coord_start_mask = np.ones(shape=bad_coord_mask.shape, dtype=np.bool) # Make first element True
-            bad_coord_start_mask[1:] = ~bad_coord_mask[0:-1] # Copy all cells shifted rightward
-            bad_coord_start_mask[:] = np.logical_and(bad_coord_mask, bad_coord_start_mask)
-            bad_coord_start_indices = np.where(bad_coord_start_mask)[0]
+            # Each line ends one point before the next line starts (or at the last point)
+            line_end_indices = np.concatenate((line_start_indices[1:], [len(line_index_array)])) - 1
             
-            bad_coord_end_mask = np.ones(shape=bad_coord_mask.shape, dtype=np.bool) # Make last element True
-            bad_coord_end_mask[0:-1] = ~bad_coord_mask[1:] # Copy inverted cells shifted leftward
-            bad_coord_end_mask[:] = np.logical_and(bad_coord_mask, bad_coord_end_mask)
-            bad_coord_end_indices = np.where(bad_coord_end_mask)[0]
+            # Detect bad block edges with one diff pass over a padded copy of the mask
+            padded_bad_coord_mask = np.concatenate(([False], bad_coord_mask, [False]))
+            bad_coord_edges = np.diff(padded_bad_coord_mask.view(np.int8))
+            bad_coord_start_indices = np.flatnonzero(bad_coord_edges == 1)
+            bad_coord_end_indices = np.flatnonzero(bad_coord_edges == -1) - 1
             
             assert bad_coord_start_indices.shape == bad_coord_end_indices.shape, 'Every bad coordinate range needs a start and end index'
             logger.debug('{} invalid coordinates found in {} blocks'.format(np.count_nonzero(bad_coord_mask), bad_coord_start_indices.shape[0]))
             
-            coordinate_flag_index_variable[:] = OBSERVED_COORDINATE_FLAG # Default to "Observed"
-            coordinate_flag_index_variable[bad_coord_mask] = INVALID_COORDINATE_FLAG # Set bad coordinates to "Invalid"
-        
+            coordinate_flag_index_buffer = np.full(shape=(self.point_count,),
+                                                   fill_value=OBSERVED_COORDINATE_FLAG,
+                                                   dtype=np.ubyte) # Default to "Observed"
+            coordinate_flag_index_buffer[bad_coord_mask] = INVALID_COORDINATE_FLAG # Set bad coordinates to "Invalid"
+
+            # Classify every bad block first, then fill them all in one pass
+            job_last_good_indices = []
+            job_next_good_indices = []
+            job_start_indices = []
+            job_point_counts = []
+            job_flag_values = []
+
+            # Locate line boundaries for all bad ranges in two vectorised binary search passes
+            # rather than one searchsorted call per range
+            start_positions = np.searchsorted(line_start_indices, bad_coord_start_indices, side='left')
+            end_positions = np.searchsorted(line_end_indices, bad_coord_end_indices, side='right') - 1
+
             for bad_range_index in range(len(bad_coord_start_indices)):
                 bad_coord_start_index = bad_coord_start_indices[bad_range_index]
                 bad_coord_end_index = bad_coord_end_indices[bad_range_index]
-                try:
-                    # Find first line start index in bad range (if any)
-                    bad_line_start_index = line_start_indices[
-                        np.where(np.logical_and((line_start_indices >= bad_coord_start_index),
-                                                (line_start_indices <= bad_coord_end_index)))[0][0]
-                        ]
-                except IndexError:
+                # First line start index in bad range (if any)
+                start_position = start_positions[bad_range_index]
+                if (start_position < len(line_start_indices)
+                    and line_start_indices[start_position] <= bad_coord_end_index):
+                    bad_line_start_index = line_start_indices[start_position]
+                else:
                     bad_line_start_index = None
-                    
-                try:
-                    # Find last line end index in bad range (if any)
-                    bad_line_end_index = line_end_indices[
-                        np.where(np.logical_and((line_end_indices >= bad_coord_start_index),
-                                                (line_end_indices <= bad_coord_end_index)))[0][-1]
-                        ]
-                except IndexError:
+
+                # Last line end index in bad range (if any)
+                end_position = end_positions[bad_range_index]
+                if (end_position >= 0
+                    and line_end_indices[end_position] >= bad_coord_start_index):
+                    bad_line_end_index = line_end_indices[end_position]
+                else:
                     bad_line_end_index = None
                 
-                logger.debug('bad_coord_start_index = {}, bad_line_end_index = {}, bad_line_start_index = {}, bad_coord_end_index = {}'.format(
-                    bad_coord_start_index, 
-                    bad_line_end_index, 
-                    bad_line_start_index, 
-                    bad_coord_end_index
+                if logger.isEnabledFor(logging.DEBUG): # Don't slice arrays or format reprs unless debug logging is on
+                    logger.debug('bad_coord_start_index = {}, bad_line_end_index = {}, bad_line_start_index = {}, bad_coord_end_index = {}'.format(
+                        bad_coord_start_index,
+                        bad_line_end_index,
+                        bad_line_start_index,
+                        bad_coord_end_index
+                        )
                     )
-                )
-                
-                logger.debug('Extended missing coordinate range:\n{}'.format(self.xycoords[bad_coord_start_index-1:bad_coord_end_index+2]))
-                
-                logger.debug('Extended Line numbers for missing points:\n{}'.format(
-                    self.netcdf_dataset.variables['line'][:][(self.netcdf_dataset.variables['line_index'][bad_coord_start_index-1:bad_coord_end_index+2])]))
-                    
+
+                    logger.debug('Extended missing coordinate range:\n{}'.format(xycoords[bad_coord_start_index-1:bad_coord_end_index+2]))
+
+                    logger.debug('Extended Line numbers for missing points:\n{}'.format(
+                        line_array[line_index_array[bad_coord_start_index-1:bad_coord_end_index+2]]))
+
                 if (bad_line_end_index is not None
                     and bad_line_start_index is not None
                     # Detect when a single line starts and finishes in the bad range (can't extrapolate ends)
-                    and (self.netcdf_dataset.variables['line_index'][bad_coord_start_index] ==
-                         self.netcdf_dataset.variables['line_index'][bad_coord_end_index])
+                    and (line_index_array[bad_coord_start_index] ==
+                         line_index_array[bad_coord_end_index])
                     ):
                     logger.debug('Unable to interpolate entire line(s)')
                     continue
                 
                 if bad_line_start_index is not None: # Coordinates need to be extrapolated to start of line
                     logger.debug('Coordinates need to be extrapolated to start of line')
-                    interpolate(self, 
-                                last_good_coord_index=None, 
-                                next_good_coord_index=bad_coord_end_index+1, 
-                                bad_point_count=bad_coord_end_index-bad_line_start_index+1
-                                )
-                    
+                    # Validate the two reference points here so the JIT kernel (which has no
+                    # bounds or NaN checks) can never silently extrapolate from bad data
+                    next_good_coord_index = bad_coord_end_index+1
+                    assert (next_good_coord_index+1 < len(xycoords)
+                            and not np.any(np.isnan(xycoords[next_good_coord_index:next_good_coord_index+2]))
+                            ), 'Unable to extrapolate to a single point'
+                    job_last_good_indices.append(-1)
+                    job_next_good_indices.append(next_good_coord_index)
+                    job_start_indices.append(bad_line_start_index)
+                    job_point_counts.append(bad_coord_end_index-bad_line_start_index+1)
+                    job_flag_values.append(EXTRAPOLATED_COORDINATE_FLAG)
+
                 if bad_line_end_index is not None: # Coordinates need to be extrapolated from end of line
                     logger.debug('Coordinates need to be extrapolated from end of line')
-                    interpolate(self, 
-                                last_good_coord_index=bad_coord_start_index-1, 
-                                next_good_coord_index=None, 
-                                bad_point_count=bad_line_end_index-bad_coord_start_index+1
-                                )
-                    
+                    last_good_coord_index = bad_coord_start_index-1
+                    assert (last_good_coord_index > 0
+                            and not np.any(np.isnan(xycoords[last_good_coord_index-1:last_good_coord_index+1]))
+                            ), 'Unable to extrapolate to a single point'
+                    job_last_good_indices.append(last_good_coord_index)
+                    job_next_good_indices.append(-1)
+                    job_start_indices.append(bad_coord_start_index)
+                    job_point_counts.append(bad_line_end_index-bad_coord_start_index+1)
+                    job_flag_values.append(EXTRAPOLATED_COORDINATE_FLAG)
+
                 if bad_line_start_index is None and bad_line_end_index is None: # Coordinates need to be interpolated between good points within a line
                     logger.debug('Coordinates need to be interpolated between good points within a line')
-                    interpolate(self, 
-                                last_good_coord_index=bad_coord_start_index-1, 
-                                next_good_coord_index=bad_coord_end_index+1, 
-                                bad_point_count=bad_coord_end_index-bad_coord_start_index+1
-                                )
-            
+                    job_last_good_indices.append(bad_coord_start_index-1)
+                    job_next_good_indices.append(bad_coord_end_index+1)
+                    job_start_indices.append(bad_coord_start_index)
+                    job_point_counts.append(bad_coord_end_index-bad_coord_start_index+1)
+                    job_flag_values.append(INTERPOLATED_COORDINATE_FLAG)
+
+            if job_start_indices:
+                if numba is not None: # Fill all blocks in one JIT compiled pass
+                    _fill_missing_blocks(xycoords,
+                                         coordinate_flag_index_buffer,
+                                         np.array(job_last_good_indices, dtype=np.int64),
+                                         np.array(job_next_good_indices, dtype=np.int64),
+                                         np.array(job_start_indices, dtype=np.int64),
+                                         np.array(job_point_counts, dtype=np.int64),
+                                         np.array(job_flag_values, dtype=np.ubyte)
+                                         )
+                else: # Pure NumPy fallback - fill each block with a vectorised interpolate() call
+                    for job_index in range(len(job_start_indices)):
+                        last_good_coord_index = job_last_good_indices[job_index]
+                        next_good_coord_index = job_next_good_indices[job_index]
+                        interpolate(last_good_coord_index=(last_good_coord_index if last_good_coord_index >= 0 else None),
+                                    next_good_coord_index=(next_good_coord_index if next_good_coord_index >= 0 else None),
+                                    bad_point_count=job_point_counts[job_index]
+                                    )
+
+            # Propagate the fixed coordinates into the longitude/latitude buffers
+            fixed_coord_mask = coordinate_flag_index_buffer >= INTERPOLATED_COORDINATE_FLAG
+            if fixed_coord_mask.any():
+                longitude_buffer[fixed_coord_mask] = xycoords[fixed_coord_mask, 0]
+                latitude_buffer[fixed_coord_mask] = xycoords[fixed_coord_mask, 1]
+
+            # Flush the accumulated coordinate fixes in a single write per variable
+            self.netcdf_dataset.variables['longitude'][:] = longitude_buffer
+            self.netcdf_dataset.variables['latitude'][:] = latitude_buffer
+            coordinate_flag_index_variable[:] = coordinate_flag_index_buffer
+
             logger.info('Finished interpolating and extrapolating missing coordinates in netCDF line dataset')
             
-            for flag_index in range(len(COORDINATE_FLAG_LIST)):
-                logger.debug('{} coordinate count = {}'.format(COORDINATE_FLAG_LIST[flag_index], np.count_nonzero(coordinate_flag_index_variable[:] == flag_index)))
-            logger.debug('Total coordinate count = {}'.format(self.point_count))
+            if logger.isEnabledFor(logging.DEBUG): # Count flags in one pass over the in-memory buffer
+                coordinate_flag_counts = np.bincount(coordinate_flag_index_buffer,
+                                                     minlength=len(COORDINATE_FLAG_LIST))
+                for flag_index in range(len(COORDINATE_FLAG_LIST)):
+                    logger.debug('{} coordinate count = {}'.format(COORDINATE_FLAG_LIST[flag_index], coordinate_flag_counts[flag_index]))
+                logger.debug('Total coordinate count = {}'.format(self.point_count))
         except:
             logger.error('Unable to interpolate and extrapolate missing coordinates in netCDF line dataset')
             raise
@@ -58,6 +58,10 @@ except ImportError:
 # Default number of points to read per chunk when retrieving data
 DEFAULT_READ_CHUNK_SIZE = 8192
 
+# Patterns matched against every variable name during point data reads - compiled once
+EXCLUDED_METADATA_VARIABLE_RE = re.compile('ga_.+_metadata')
+INDEX_VARIABLE_SUFFIX_RE = re.compile('_index$')
+
 # Set this to a number other than zero for testing
 POINT_LIMIT = 0
     
@@ -230,7 +234,7 @@ class NetCDFPointUtils(NetCDFUtils):
             :param geometry: (multi)polygon
             :return mask: Boolean array of size n 
             """
-            mask = np.zeros(shape=(points.shape[0]), dtype=np.bool)
+            mask = np.zeros(shape=(points.shape[0]), dtype=np.bool_)
             
             chunk_start_index = 0
             while chunk_start_index < len(points):
@@ -268,7 +272,7 @@ class NetCDFPointUtils(NetCDFUtils):
             # Shortcut the whole process if the extents are within the bounds geometry       
             if asPolygon(self.native_bbox).within(native_crs_bounds):
                 logger.debug('Dataset is completely contained within bounds')
-                return np.ones(shape=(len(coordinates),), dtype=np.bool)
+                return np.ones(shape=(len(coordinates),), dtype=np.bool_)
                 
             bounds_half_size = abs(np.array([native_crs_bounds.bounds[2] - native_crs_bounds.bounds[0], 
                                              native_crs_bounds.bounds[3] - native_crs_bounds.bounds[1]])) / 2.0
@@ -295,14 +299,28 @@ class NetCDFPointUtils(NetCDFUtils):
                 and self.bounds[3] <= native_crs_bounds[3]
                 ):
                 logger.debug('Dataset is completely contained within bounds')
-                return np.ones(shape=(len(coordinates),), dtype=np.bool)
+                return np.ones(shape=(len(coordinates),), dtype=np.bool_)
                 
         
             bounds_half_size = abs(np.array([native_crs_bounds[2] - native_crs_bounds[0], native_crs_bounds[3] - native_crs_bounds[1]])) / 2.0
             bounds_centroid = np.array([native_crs_bounds[0], native_crs_bounds[1]]) + bounds_half_size
-            
-            # Return true for each point which is <= bounds_half_size distance from bounds_centroid
-            mask = np.all(ne.evaluate("abs(coordinates - bounds_centroid) <= bounds_half_size"), axis=1)  
+
+            if self._kdtree is not None: # KDTree already built - use it rather than scanning every point
+                # Chebyshev-norm ball query returns candidates within the bounding square
+                # in O(log N + k); refine to the exact (possibly non-square) rectangle
+                candidate_indices = np.array(self._kdtree.query_ball_point(bounds_centroid.flatten(),
+                                                                           r=float(np.max(bounds_half_size)),
+                                                                           p=np.inf),
+                                             dtype=np.int64)
+                mask = np.zeros(shape=(len(coordinates),), dtype=np.bool_)
+                if len(candidate_indices):
+                    candidate_mask = np.all(abs(coordinates[candidate_indices] - bounds_centroid.flatten())
+                                            <= bounds_half_size.flatten(),
+                                            axis=1)
+                    mask[candidate_indices[candidate_mask]] = True
+            else:
+                # Return true for each point which is <= bounds_half_size distance from bounds_centroid
+                mask = np.all(ne.evaluate("abs(coordinates - bounds_centroid) <= bounds_half_size"), axis=1)
                       
         logger.debug('{}/{} points found in final mask'.format(np.count_nonzero(mask), len(coordinates)))
         return mask
@@ -599,7 +617,7 @@ class NetCDFPointUtils(NetCDFUtils):
                 lookup_variable_name = indexing_variable.lookup
             elif indexing_variable_name.endswith('_index'):
                 # Infer lookup variable name from indexing variable name
-                lookup_variable_name = re.sub('_index$', '', indexing_variable_name)
+                lookup_variable_name = INDEX_VARIABLE_SUFFIX_RE.sub('', indexing_variable_name)
             else:
                 raise BaseException('lookup_variable_name not supplied and cannot be inferred')
             
@@ -649,7 +667,7 @@ class NetCDFPointUtils(NetCDFUtils):
 #                 lookup_variable_name = indexing_variable.lookup
 #             elif indexing_variable_name.endswith('_index'):
 #                 # Infer lookup variable name from indexing variable name
-#                 lookup_variable_name = re.sub('_index$', '', indexing_variable_name)
+#                 lookup_variable_name = INDEX_VARIABLE_SUFFIX_RE.sub('', indexing_variable_name)
 #             else:
 #                 raise BaseException('lookup_variable_name not supplied and cannot be inferred')
 #             
@@ -746,7 +764,7 @@ class NetCDFPointUtils(NetCDFUtils):
                 lookup_variable_name = indexing_variable.lookup
             elif indexing_variable_name.endswith('_index'):
                 # Infer lookup variable name from indexing variable name
-                lookup_variable_name = re.sub('_index$', '', indexing_variable_name)
+                lookup_variable_name = INDEX_VARIABLE_SUFFIX_RE.sub('', indexing_variable_name)
             else:
                 raise BaseException('lookup_variable_name not supplied and cannot be inferred')
             
@@ -773,42 +791,42 @@ class NetCDFPointUtils(NetCDFUtils):
             
         return result_array
                        
-    def chunk_point_data_generator(self, 
-                                   start_index=0, 
-                                   end_index=0,
-                                   field_list=None,
-                                   mask=None,
-                                   yield_variable_attributes_first=False):
+    def _read_point_data_columns(self,
+                                 start_index=0,
+                                 end_index=0,
+                                 field_list=None,
+                                 mask=None):
         '''
-        Generator to optionally yield variable attributes followed by all point data for the specified point index range
-        Used to retrieve data as chunks for outputting as point-wise lists of lists
-        @param start_index: start point index of range to read 
+        Read the specified fields for a point index range into column arrays, preserving
+        the columnar (SoA) layout of the netCDF file - one read per variable
+        @param start_index: start point index of range to read
         @param end_index: end point index of range to read. Defaults to number of points
-        @param field_list: Optional list of field names to read. Default is None for all variables 
+        @param field_list: Optional list of field names to read. Default is None for all variables
         @param mask: Optional Boolean mask array to subset points
-        @param yield_variable_attributes_first: Boolean flag to determine whether variable attribute dict is yielded first. Defaults to False
-        
-        @yield variable_attributes: dict of netCDF variable attributes. Optionally the first item yielded if yield_variable_attributes_first is True
-        @yield point_value_list: List of single values for 1D variables or sub-lists for 2D variables for a single point
+
+        @return variable_attributes: OrderedDict of netCDF variable attribute dicts keyed by variable name
+        @return memory_cache: OrderedDict of masked column arrays keyed by variable name
+        @return index_range: number of points read
         '''
-        # Start of point_data_generator function
         end_index = end_index or self.point_count
         index_range = end_index - start_index
-         
+
         if mask is None: # No mask defined - take all points in range
             subset_mask = np.ones(shape=(index_range,), dtype='bool')
         else:
             subset_mask = mask[start_index:end_index]
             index_range = np.count_nonzero(subset_mask)
-             
+
+        variable_attributes = OrderedDict()
+        memory_cache = OrderedDict()
+
         # If no points to retrieve, don't read anything
         if not index_range:
-            logger.debug('No points to retrieve for point indices {}-{}: All masked out'.format(start_index, end_index-1))            
-            return
-        
+            return variable_attributes, memory_cache, 0
+
         # Generate full field list if None provided
         if not field_list:
-            field_list = [variable.name 
+            field_list = [variable.name
                           for variable in self.netcdf_dataset.variables.values()
                           if (not len(variable.dimensions) # Scalar variable
                               or variable.dimensions[0] == 'point' # Variable is of point dimension
@@ -817,57 +835,126 @@ class NetCDFPointUtils(NetCDFUtils):
                                   and self.netcdf_dataset.variables[variable.dimensions[0] + '_index'].dimensions[0] == 'point' # index variable is of point dimension
                                   )
                               )
-                          and not variable.name.endswith('_index') 
+                          and not variable.name.endswith('_index')
                             and not hasattr(variable, 'lookup') # Variable is not an index variable
-                          and not variable.name in NetCDFUtils.CRS_VARIABLE_NAMES 
-                            and not re.match('ga_.+_metadata', variable.name) # Not an excluded variable
+                          and not variable.name in NetCDFUtils.CRS_VARIABLE_NAMES
+                            and not EXCLUDED_METADATA_VARIABLE_RE.match(variable.name) # Not an excluded variable
                           ]
- 
+
         logger.debug('field_list: {}'.format(field_list))
-        
-        variable_attributes = OrderedDict()
-        memory_cache = OrderedDict()
+
         for variable_name in field_list:
             variable = self.netcdf_dataset.variables.get(variable_name)
             if variable is None:
                 logger.warning('Variable {} does not exist. Skipping.'.format(variable_name))
                 continue
             #logger.debug('variable_name: {}'.format(variable_name))
-            
+
             # Scalar variable
             if len(variable.shape) == 0:
                 # Skip CRS variable
-                if variable_name in NetCDFUtils.CRS_VARIABLE_NAMES or re.match('ga_.+_metadata', variable_name):
-                    continue 
-                
+                if variable_name in NetCDFUtils.CRS_VARIABLE_NAMES or EXCLUDED_METADATA_VARIABLE_RE.match(variable_name):
+                    continue
+
                 # Repeat scalar value for each point
                 data_array = variable[:]
                 memory_cache[variable_name] = np.array([data_array] * index_range)
-                 
+
             else: # nD array variable
                 if (variable.dimensions[0] != 'point'): # Variable is NOT of point dimension - must be lookup
-                    memory_cache[variable_name] = self.expand_lookup_variable(lookup_variable_name=variable_name, 
-                                                                              start_index=start_index, 
-                                                                              end_index=end_index, 
-                                                                              mask=mask)                     
+                    memory_cache[variable_name] = self.expand_lookup_variable(lookup_variable_name=variable_name,
+                                                                              start_index=start_index,
+                                                                              end_index=end_index,
+                                                                              mask=mask)
                 else: # 'point' is in variable.dimensions - "normal" variable
                     data_array = variable[start_index:end_index]
-                     
+
                     # Include fill_values if array is masked
                     if type(data_array) == np.ma.core.MaskedArray:
                         data_array = data_array.data
-                         
+
                     memory_cache[variable_name] = data_array[subset_mask]
-               
-            if yield_variable_attributes_first:
-                variable_attributes[variable_name] = dict(variable.__dict__)
-            
+
+            variable_attributes[variable_name] = dict(variable.__dict__)
+
+        return variable_attributes, memory_cache, index_range
+
+
+    def point_data_columns(self,
+                           field_list=None,
+                           mask=None,
+                           read_chunk_size=None):
+        '''
+        Return all point data for the specified fields as column arrays instead of
+        per-point lists, keeping the columnar layout the netCDF file already has
+        @param field_list: Optional list of field names to read. Default is None for all variables
+        @param mask: Optional Boolean mask array to subset points
+        @param read_chunk_size: Number of points to read from the netCDF per chunk
+
+        @return column_dict: OrderedDict of masked column arrays keyed by variable name
+        '''
+        read_chunk_size = read_chunk_size or DEFAULT_READ_CHUNK_SIZE
+
+        chunk_column_dicts = []
+        for chunk_index in range(self.point_count // read_chunk_size + 1):
+            _variable_attributes, memory_cache, index_range = \
+                self._read_point_data_columns(start_index=chunk_index*read_chunk_size,
+                                              end_index=min((chunk_index+1)*read_chunk_size,
+                                                            self.point_count
+                                                            ),
+                                              field_list=field_list,
+                                              mask=mask)
+            if index_range:
+                chunk_column_dicts.append(memory_cache)
+
+        column_dict = OrderedDict()
+        if chunk_column_dicts:
+            for variable_name in chunk_column_dicts[0].keys():
+                chunk_columns = [chunk_column_dict[variable_name]
+                                 for chunk_column_dict in chunk_column_dicts]
+                column_dict[variable_name] = (chunk_columns[0] if len(chunk_columns) == 1
+                                              else np.concatenate(chunk_columns))
+        return column_dict
+
+
+    def chunk_point_data_generator(self,
+                                   start_index=0,
+                                   end_index=0,
+                                   field_list=None,
+                                   mask=None,
+                                   yield_variable_attributes_first=False):
+        '''
+        Generator to optionally yield variable attributes followed by all point data for the specified point index range
+        Used to retrieve data as chunks for outputting as point-wise lists of lists
+        @param start_index: start point index of range to read
+        @param end_index: end point index of range to read. Defaults to number of points
+        @param field_list: Optional list of field names to read. Default is None for all variables
+        @param mask: Optional Boolean mask array to subset points
+        @param yield_variable_attributes_first: Boolean flag to determine whether variable attribute dict is yielded first. Defaults to False
+
+        @yield variable_attributes: dict of netCDF variable attributes. Optionally the first item yielded if yield_variable_attributes_first is True
+        @yield point_value_list: List of single values for 1D variables or sub-lists for 2D variables for a single point
+        '''
+        # Start of point_data_generator function
+        end_index = end_index or self.point_count
+
+        variable_attributes, memory_cache, index_range = \
+            self._read_point_data_columns(start_index=start_index,
+                                          end_index=end_index,
+                                          field_list=field_list,
+                                          mask=mask)
+
+        # If no points were retrieved, don't yield anything
+        if not index_range:
+            logger.debug('No points to retrieve for point indices {}-{}: All masked out'.format(start_index, end_index-1))
+            return
+
         logger.debug('variable_attributes: {}'.format(pformat(variable_attributes)))
         logger.debug('memory_cache: {}'.format(pformat(memory_cache)))
-        
+
         if yield_variable_attributes_first:
             yield variable_attributes
-        
+
         for index in range(index_range):
             point_value_list = []
             for variable_name, variable in iter(memory_cache.items()):
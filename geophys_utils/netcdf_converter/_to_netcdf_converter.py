@@ -58,14 +58,16 @@ class NetCDFVariable(object):
                  attributes, 
                  dtype=None,
                  chunk_size=None, # None means take default, zero means not chunked
-                 variable_parameters=None
-                 ): 
+                 variable_parameters=None,
+                 chunk_cache_bytes=None
+                 ):
         '''
         Constructor for class NetCDFVariable to manage netCDF variable contents
         @param variable_parameters: dict containing parameters for netCDF variable creation
         @param dtype: Optional datatype to override data
         @param chunk_size: single default chunk size for all dimensions. None means take default, zero means not chunked.
             Note that custom chunk sizes per dimension can be specified using chunksizes value in variable_parameters
+        @param chunk_cache_bytes: Optional per-variable HDF5 chunk cache size in bytes. None means take the library default
         '''
         self.short_name = short_name # String used for variable name
         self.data = data # Numpy array or None for not set
@@ -73,6 +75,8 @@ class NetCDFVariable(object):
         self.attributes = attributes # dict of variable attribute <key>:<value> pairs 
         self.variable_parameters = dict(variable_parameters or NetCDFVariable.DEFAULT_VARIABLE_PARAMETERS)
         
+        self.chunk_cache_bytes = chunk_cache_bytes
+
         # chunk_size = None means take default, zero means not chunked
         self.chunk_size = chunk_size
         if self.chunk_size is None:
@@ -135,6 +139,13 @@ class NetCDFVariable(object):
                                                            self.dimensions,
                                                            **variable_parameters
                                                            )
+        # Size the per-variable HDF5 chunk cache if requested
+        if self.chunk_cache_bytes:
+            try:
+                output_variable.set_var_chunk_cache(size=self.chunk_cache_bytes)
+            except Exception as e:
+                logger.debug('Unable to set variable chunk cache: {}'.format(e))
+
         # Set data values
         if self.data is not None:
             output_variable[:] = self.data
@@ -186,6 +197,15 @@ class ToNetCDFConverter(object):
             logger.debug('Closed netCDF output dataset')
         except Exception as e:
             logger.debug('Unable to close netCDF output dataset: {}'.format(e))
+
+    def close(self):
+        '''
+        Flush and close netCDF output dataset explicitly. Relying on __del__ defers
+        release of the underlying HDF5 chunk cache until garbage collection
+        '''
+        self.nc_output_dataset.sync()
+        self.nc_output_dataset.close()
+        logger.debug('Closed netCDF output dataset')
         
     @abc.abstractmethod
     def get_global_attributes(self):
@@ -423,10 +443,12 @@ class ToNetCDFConverter(object):
         for nc_variable in self.variable_generator():
             nc_variable.create_var_in_dataset(self.nc_output_dataset) 
             
-        # Set global attributes in netCDF output file
-        logger.debug('self.get_global_attributes(): {}'.format(self.get_global_attributes()))
-        for attribute_name, attribute_value in iter(self.get_global_attributes().items()):
-            setattr(self.nc_output_dataset, attribute_name, attribute_value or '')
+        # Set global attributes in netCDF output file in one batched call - per-attribute
+        # setattr would trigger a separate metadata update for every key
+        global_attributes = self.get_global_attributes()
+        logger.debug('self.get_global_attributes(): {}'.format(global_attributes))
+        self.nc_output_dataset.setncatts({attribute_name: attribute_value or ''
+                                          for attribute_name, attribute_value in global_attributes.items()})
             
         self.postprocess_netcdf()
             
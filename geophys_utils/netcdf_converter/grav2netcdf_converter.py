@@ -25,6 +25,7 @@ Created on 28Mar.2018
 #TODO update creationg date
 
 from collections import OrderedDict
+import concurrent.futures
 import numpy as np
 import cx_Oracle
 from geophys_utils.netcdf_converter import ToNetCDFConverter, NetCDFVariable
@@ -32,11 +33,58 @@ from geophys_utils import points2convex_hull
 import sys
 import re
 from datetime import datetime
+import functools
 import yaml
 import os
+import json
 import logging
 
 
+# Precompiled once - matched against every survey id row in main()
+_DIGITS_RE = re.compile(r'\d+')
+
+# Target on-disk chunk size for point variables. Multi-MB chunks keep the HDF5
+# filter pipeline (zlib+shuffle) efficient; netCDF4 defaults are far too small
+_TARGET_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _load_settings():
+    """
+    Load and memoize the converter settings so the YAML file is only parsed once per process.
+    """
+    try:
+        logger.debug(os.path.splitext(__file__)[0] + '_settings.yml')
+        settings = yaml.safe_load(open(os.path.splitext(__file__)[0] + '_settings.yml'))
+        logger.debug('Settings' + str(settings))
+        return settings
+    except (OSError, yaml.YAMLError):
+        logger.debug("Yaml load fail")
+        return {}
+
+
+def _lob_output_type_handler(cursor, name, default_type, size, precision, scale):
+    """
+    cx_Oracle output type handler to fetch LOB columns as long strings/bytes in the
+    initial round trip instead of one .read() round trip per value.
+    """
+    if default_type == cx_Oracle.CLOB:
+        return cursor.var(cx_Oracle.LONG_STRING, arraysize=cursor.arraysize)
+    if default_type == cx_Oracle.BLOB:
+        return cursor.var(cx_Oracle.LONG_BINARY, arraysize=cursor.arraysize)
+
+
+def _float_output_type_handler(cursor, name, default_type, size, precision, scale):
+    """
+    cx_Oracle output type handler to bind NUMBER columns as native doubles so values
+    cross the driver boundary as C doubles rather than Python Decimal objects.
+    LOB columns still arrive inline.
+    """
+    if default_type == cx_Oracle.NUMBER:
+        return cursor.var(cx_Oracle.NATIVE_FLOAT, arraysize=cursor.arraysize)
+    return _lob_output_type_handler(cursor, name, default_type, size, precision, scale)
+
+
 # # Create the Logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -120,13 +168,14 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         # 'CONFID_UNTIL', not needed
     ]
 
-    try:
-        logger.debug(os.path.splitext(__file__)[0] + '_settings.yml')
-        settings = yaml.safe_load(open(os.path.splitext(__file__)[0] + '_settings.yml'))
-        logger.debug('Settings' + str(settings))
-    except:
-        logger.debug("Yaml load fail")
-        settings = {}
+    # Frozen set copy for O(1) membership tests when filtering survey metadata
+    gravity_metadata_set = frozenset(gravity_metadata_list)
+
+    settings = _load_settings()
+
+    # Lookup tables are identical for every survey, so cache them per process rather than
+    # re-querying Oracle for each survey (and twice per survey for dimensions and variables)
+    _lookup_table_cache = {}
 
     def get_all_ellipsoiddatum_values_table_from_point_data(self):
         """
@@ -142,6 +191,10 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         with the key and value information such as accuracy or methodology.
         e.g. 'SUR': 'Positions determined by optical surveying methods or measured on surveyed points.'
         """
+        cached_table = Grav2NetCDFConverter._lookup_table_cache.get(table_name)
+        if cached_table is not None:
+            return cached_table
+
         # TODO fix this
         if table_name == "ELLIPSOIDHGTDATUM":
             #return {"GRS80": "GRS80"}
@@ -156,6 +209,7 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
                 logger.debug("More than one value for ellipsoiddatum found.")
             print("ELLIPSOIDHGTDATUM")
             print("keys_and_values_dict: {}".format(keys_and_values_dict))
+            Grav2NetCDFConverter._lookup_table_cache[table_name] = keys_and_values_dict
             return keys_and_values_dict
 
 
@@ -167,29 +221,9 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             keys_and_values_dict[s[0]] = s[1]
 
         # returns as string. Python dict not accepted.
+        Grav2NetCDFConverter._lookup_table_cache[table_name] = keys_and_values_dict
         return keys_and_values_dict
 
-    def get_value_for_key(self, value_column: str, table_name: str, key_column: str,  key: str):
-        """
-        Retrieves all data from a specified table, converts into a dictionary, and returns as a string. Used for tables
-        with the key and value information such as accuracy or methodology.
-        e.g. 'SUR': 'Positions determined by optical surveying methods or measured on surveyed points.'
-        """
-
-        cleaned_key = str(key)
-        list_of_characters_to_remove = ["\(", "\)", "\'", "\,"]
-        for character in list_of_characters_to_remove:
-            cleaned_key = re.sub(character, '', cleaned_key)
-
-        sql_statement = "select {0} from gravity.{1} where {2} = '{3}'".format(value_column, table_name, key_column, cleaned_key)
-        query_result = self.cursor.execute(sql_statement)
-        key_to_return = str(next(query_result))
-
-        for character in list_of_characters_to_remove:
-            key_to_return = re.sub(character, '', key_to_return)
-
-        return key_to_return
-
     def __init__(self, nc_out_path, survey_id, con, sql_strings_dict_from_yaml, netcdf_format='NETCDF4'):
         """
         Concrete constructor for subclass CSV2NetCDFConverter
@@ -200,10 +234,18 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         ToNetCDFConverter.__init__(self, nc_out_path, netcdf_format)
 
         self.cursor = con.cursor()
+        self.cursor.outputtypehandler = _lob_output_type_handler # Fetch any LOB columns inline
         self.survey_id = survey_id
         self.sql_strings_dict_from_yaml = sql_strings_dict_from_yaml
 
+        # Cache the survey point count up front - it sizes every bulk fetch and preallocation
+        self.cursor.execute(self.sql_strings_dict_from_yaml['get_dimensions'],
+                            {'survey_id': self.survey_id})
+        self.point_count = int(next(self.cursor)[0])
+
         self.survey_metadata = self.get_survey_metadata()
+        self._lookup_index_cache = {} # Sorted key array and sorter per lookup table for vectorised mapping
+        self._field_column_cache = {} # Per-field observation columns from the single bulk fetch
         self.elipsoid_height_datums = []
         #self.get_ellipsoid_height_datum_keys()
 
@@ -216,8 +258,9 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         """
         # TODO are the filters needed in the sql? It will pass this survey id if no observation data is used later on?
 
-        formatted_sql = self.sql_strings_dict_from_yaml['get_survey_metadata'].format(self.survey_id)
-        query_result = self.cursor.execute(formatted_sql)
+        # Bind the survey id so Oracle can reuse the parsed statement across surveys
+        query_result = self.cursor.execute(self.sql_strings_dict_from_yaml['get_survey_metadata'],
+                                           {'survey_id': self.survey_id})
         field_names = [field_desc[0] for field_desc in query_result.description]
         survey_row = next(query_result)
 
@@ -241,37 +284,35 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         :param field: The target column in the observations table.
         :return: The first value of the specified field of the observations table.
         """
-        formatted_sql = self.sql_strings_dict_from_yaml['get_data'].format('o1.'+field, "null", self.survey_id)
-        formatted_sql = formatted_sql.replace('select', 'select distinct', 1)  # Only retrieve distinct results
-        formatted_sql = re.sub('order by .*$', '', formatted_sql) # Don't bother sorting
-        query_result = self.cursor.execute(formatted_sql)
-        value = None
+        # Let Oracle prove uniqueness - at most two distinct non-null rows ever leave the server
+        formatted_sql = self.sql_strings_dict_from_yaml['check_all_values_in_survey_consistent'].format('o1.'+field)
+        self.cursor.execute(formatted_sql, {'survey_id': self.survey_id})
+        rows = self.cursor.fetchall()
 
-        for result in query_result:
-            logger.debug('value: {}, result: {}'.format(value, result))
-            
-            if value is None:
-                value = result[0]
-            
-            assert value is None or result[0] == value or result[0] is None, 'Variant value found in survey-wide column {}'.format(field)
-        return value
+        assert len(rows) <= 1, 'Variant value found in survey-wide column {}'.format(field)
+        return rows[0][0] if rows else None
 
     def get_global_attributes(self):
         '''
         Concrete method to return dict of global attribute <key>:<value> pairs
         '''        
+        # Read each coordinate/accuracy variable from the dataset once and reuse the in-memory arrays
+        longitude_array = np.asarray(self.nc_output_dataset.variables['longitude'][:])
+        latitude_array = np.asarray(self.nc_output_dataset.variables['latitude'][:])
+        locacc_array = np.asarray(self.nc_output_dataset.variables['locacc'][:])
+
         metadata_dict = {
             'title': self.survey_metadata['SURVEYNAME'],
                          'survey_id': self.survey_id,
             'Conventions': "CF-1.6,ACDD-1.3",
             'keywords': 'points, gravity, ground digital data, geophysical survey, survey {0}, {1}, {2}, Earth sciences,'
                         ' geophysics, geoscientificInformation'.format(self.survey_id, self.survey_metadata['COUNTRYID'], self.survey_metadata['STATEGROUP']),
-            'geospatial_lon_min': np.min(self.nc_output_dataset.variables['longitude']),
-            'geospatial_lon_max': np.max(self.nc_output_dataset.variables['longitude']),
+            'geospatial_lon_min': longitude_array.min(),
+            'geospatial_lon_max': longitude_array.max(),
             'geospatial_lon_units': "degrees_east",
             'geospatial_lon_resolution': "point",
-            'geospatial_lat_min': np.min(self.nc_output_dataset.variables['latitude']),
-            'geospatial_lat_max': np.max(self.nc_output_dataset.variables['latitude']),
+            'geospatial_lat_min': latitude_array.min(),
+            'geospatial_lat_max': latitude_array.max(),
             'geospatial_lat_units': "degrees_north",
             'geospatial_lat_resolution': "point",
             'history': "Pulled from point gravity database at Geoscience Australia",
@@ -279,8 +320,8 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             "gravity based on the underlying structure or geology".format(self.survey_id,
                                                                       self.survey_metadata['SURVEYNAME'],
                                                                       self.survey_metadata['STATEGROUP']),
-            'location_accuracy_min': np.min(self.nc_output_dataset.variables['locacc']),
-            'location_accuracy_max': np.max(self.nc_output_dataset.variables['locacc']),
+            'location_accuracy_min': locacc_array.min(),
+            'location_accuracy_max': locacc_array.max(),
             'time_coverage_start': str(self.survey_metadata.get('STARTDATE')),
             'time_coverage_end': str(self.survey_metadata.get('ENDDATE')),
             'time_coverage_duration': str(self.survey_metadata.get('ENDDATE') - self.survey_metadata.get('STARTDATE'))
@@ -294,31 +335,33 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
 
         try:
             #Compute convex hull and add GML representation to metadata
-            coordinates = np.array(list(zip(self.nc_output_dataset.variables['longitude'][:],
-                                            self.nc_output_dataset.variables['latitude'][:]
-                                            )
-                                        )
-                                   )
-            if len(coordinates) >=3:
-                convex_hull = points2convex_hull(coordinates)        
-                metadata_dict['geospatial_bounds'] = 'POLYGON((' + ', '.join([' '.join(
-                    ['%.4f' % ordinate for ordinate in coordinates]) for coordinates in convex_hull]) + '))'
+            coordinates = np.column_stack((longitude_array, latitude_array))
+            if len(coordinates) >= 3:
+                bounding_geometry = np.asarray(points2convex_hull(coordinates))
             elif len(coordinates) == 2: # Two points - make bounding box
-                bounding_box = [[min(coordinates[:,0]), min(coordinates[:,1])],
-                                [max(coordinates[:,0]), min(coordinates[:,1])],
-                                [max(coordinates[:,0]), max(coordinates[:,1])],
-                                [min(coordinates[:,0]), max(coordinates[:,1])],
-                                [min(coordinates[:,0]), min(coordinates[:,1])]
-                                ]
-                metadata_dict['geospatial_bounds'] = 'POLYGON((' + ', '.join([' '.join(
-                    ['%.4f' % ordinate for ordinate in coordinates]) for coordinates in bounding_box]) + '))'
-            elif len(coordinates) == 1: # Single point
+                west, south = coordinates.min(axis=0)
+                east, north = coordinates.max(axis=0)
+                bounding_geometry = np.array([[west, south],
+                                              [east, south],
+                                              [east, north],
+                                              [west, north],
+                                              [west, south]
+                                              ])
+            else: # Single point
                 #TODO: Check whether this is allowable under ACDD
-                metadata_dict['geospatial_bounds'] = 'POINT((' + ' '.join(
-                    ['%.4f' % ordinate for ordinate in coordinates[0]]) + '))'
-        except:
-            logger.warning('Unable to write global attribute "geospatial_bounds"')
-            
+                bounding_geometry = coordinates
+
+            if len(coordinates):
+                # Format every ordinate in one C-level pass rather than per-vertex Python comprehensions
+                ordinate_strings = np.char.mod('%.4f', bounding_geometry)
+                vertex_string = ', '.join(' '.join(vertex) for vertex in ordinate_strings)
+                if len(coordinates) == 1:
+                    metadata_dict['geospatial_bounds'] = 'POINT((' + vertex_string + '))'
+                else:
+                    metadata_dict['geospatial_bounds'] = 'POLYGON((' + vertex_string + '))'
+        except Exception as e:
+            logger.warning('Unable to write global attribute "geospatial_bounds": {}'.format(e))
+
         return metadata_dict
 
     def get_dimensions(self):
@@ -326,12 +369,8 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         Concrete method to return OrderedDict of <dimension_name>:<dimension_size> pairs
         '''
 
-        formatted_sql = self.sql_strings_dict_from_yaml['get_dimensions'].format(self.survey_id)
-        self.cursor.execute(formatted_sql)
-        point_count = int(next(self.cursor)[0])
-
         dimensions = OrderedDict()
-        dimensions['point'] = point_count  # number of points per survey
+        dimensions['point'] = self.point_count  # number of points per survey - counted once in the constructor
 
         for field_value in Grav2NetCDFConverter.settings['field_names'].values():
             if field_value.get('lookup_table'):
@@ -357,43 +396,120 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             Call an sql query to retrieve a data list of the specified field. A different query is called for freeair
             and bouguer.
             :param field_yml_settings_dict:
-            :return: data list
+            :return: data array (or key list for lookup fields)
             """
+            # Serve the column from the bulk fetch when available - no per-field table scan
+            cached_column = self._field_column_cache.get(field_name)
+            if cached_column is not None:
+                return cached_column
 
             if field_name in ['Freeair', 'Bouguer']:
                 formatted_sql = self.sql_strings_dict_from_yaml['get_data'].format(field_yml_settings_dict['database_field_name'],
-                                                                                   field_yml_settings_dict['fill_value'], self.survey_id)
+                                                                                   field_yml_settings_dict['fill_value'])
 
             else:
                 formatted_sql = self.sql_strings_dict_from_yaml['get_data'].format('o1.'+field_yml_settings_dict['database_field_name'],
-                                                                                   field_yml_settings_dict['fill_value'],
-                                                                               self.survey_id)
+                                                                                   field_yml_settings_dict['fill_value'])
+
+            # Bound the fetch buffers so big surveys stream in batches instead of one full materialisation
+            self.cursor.arraysize = min(self.point_count, 10000) or 10000
+            self.cursor.prefetchrows = self.cursor.arraysize + 1
+            # Fetch float columns as native doubles rather than Decimal objects
+            self.cursor.outputtypehandler = (_float_output_type_handler
+                                             if field_yml_settings_dict['dtype'] == 'float32'
+                                             else _lob_output_type_handler)
 
             try:
-                self.cursor.execute(formatted_sql)
-            except:
+                self.cursor.execute(formatted_sql, {'survey_id': self.survey_id})
+            except cx_Oracle.DatabaseError:
                 logger.debug(formatted_sql)
                 raise
 
-            print("cursor")
-            print(type(self.cursor))
-            data_list = [x[0] for x in self.cursor] # get the first index. Otherwise each point is within its own tuple.
-            # for i in self.cursor:
-            #     data_list.append(
-            #         i[0])
-            # print(data_list)
-            return data_list
+            if field_yml_settings_dict.get('lookup_table'): # String keys - keep as a list for lookup mapping
+                return [row[0] for row in self.cursor]
+
+            # Numeric column - stream arraysize-sized batches straight into a preallocated array
+            # rather than accumulating the whole survey in a Python list first
+            out = np.empty(shape=(self.point_count,), dtype=field_yml_settings_dict['dtype'])
+            row_index = 0
+            while True:
+                rows = self.cursor.fetchmany()
+                if not rows:
+                    break
+                out[row_index:row_index+len(rows)] = np.fromiter((row[0] for row in rows),
+                                                                 dtype=out.dtype,
+                                                                 count=len(rows))
+                row_index += len(rows)
+            return out[:row_index]
+
+        def fetch_all_field_columns():
+            """
+            Pull every configured observation column for the survey in a single SELECT and
+            split the rows into per-field columns, instead of re-scanning the observations
+            table once per field. Columns are cached for get_data to serve.
+            """
+            field_items = [(bulk_field_name, bulk_field_value)
+                           for bulk_field_name, bulk_field_value in Grav2NetCDFConverter.settings['field_names'].items()
+                           if bulk_field_value.get('database_field_name')]
+
+            select_expressions = []
+            for bulk_field_name, bulk_field_value in field_items:
+                if bulk_field_name in ['Freeair', 'Bouguer']:
+                    column_expression = bulk_field_value['database_field_name']
+                else:
+                    column_expression = 'o1.' + bulk_field_value['database_field_name']
+                select_expressions.append('NVL({0}, {1})'.format(column_expression,
+                                                                 bulk_field_value['fill_value']))
+
+            # Reuse the get_data template with the select list spliced in place of the single column
+            formatted_sql = self.sql_strings_dict_from_yaml['get_data'].format('__select_list__', 'NULL')
+            formatted_sql = formatted_sql.replace('NVL(__select_list__, NULL)', ', '.join(select_expressions))
+
+            self.cursor.arraysize = min(self.point_count, 10000) or 10000
+            self.cursor.prefetchrows = self.cursor.arraysize + 1
+            self.cursor.outputtypehandler = _float_output_type_handler
+            try:
+                self.cursor.execute(formatted_sql, {'survey_id': self.survey_id})
+            except cx_Oracle.DatabaseError:
+                logger.debug(formatted_sql)
+                raise
+
+            # Numeric columns stream straight into preallocated arrays sized from the point
+            # count, so peak memory is one typed buffer per column rather than the whole
+            # survey as Python objects plus a numpy copy. Lookup (string key) columns stay
+            # as lists for the key mapping
+            column_stores = []
+            for bulk_field_name, bulk_field_value in field_items:
+                if bulk_field_value.get('lookup_table'):
+                    column_stores.append([])
+                else:
+                    column_stores.append(np.empty(shape=(self.point_count,),
+                                                  dtype=bulk_field_value['dtype']))
+
+            row_index = 0
+            while True:
+                rows = self.cursor.fetchmany()
+                if not rows:
+                    break
+                for column_store, column_values in zip(column_stores, zip(*rows)):
+                    if isinstance(column_store, list):
+                        column_store.extend(column_values)
+                    else:
+                        column_store[row_index:row_index+len(rows)] = np.fromiter(column_values,
+                                                                                  dtype=column_store.dtype,
+                                                                                  count=len(rows))
+                row_index += len(rows)
+
+            for (bulk_field_name, _bulk_field_value), column_store in zip(field_items, column_stores):
+                self._field_column_cache[bulk_field_name] = (column_store if isinstance(column_store, list)
+                                                             else column_store[:row_index])
 
         def generate_ga_metadata_dict():
-            gravity_metadata = {}
-            for key, value in iter(self.survey_metadata.items()):
-                for metadata_attribute in Grav2NetCDFConverter.gravity_metadata_list:
-                    if value is not None:
-                        if key == metadata_attribute:
-                            if type(value) == datetime:
-                                gravity_metadata[key] = value.isoformat()
-                            else:
-                                gravity_metadata[key] = value
+            # Single pass over the metadata with set membership instead of a quadratic attribute scan
+            gravity_metadata = {key: (value.isoformat() if type(value) == datetime else value)
+                                for key, value in self.survey_metadata.items()
+                                if value is not None
+                                and key in Grav2NetCDFConverter.gravity_metadata_set}
 
             logger.debug("GA gravity metadata")
             logger.debug(gravity_metadata)
@@ -415,33 +531,31 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             logger.debug('- - - - - - - - - - - - - - - -')
             logger.debug('handle_key_value_cases() with field value: ' + str(field_value) + ' and lookup_table_dict: ' + str(lookup_table_dict))
 
-            # get the keys into a list
-            lookup_key_list = [lookup_key for lookup_key in lookup_table_dict.keys()]
-
-            # create the lookup table to convert variables with strings as keys.
-            lookup_dict = {lookup_key: lookup_key_list.index(lookup_key)
-                           for lookup_key in lookup_key_list}
-            
-            # get the array of numeric foreign key values
-            field_data_array = get_data(field_yml_settings_dict)
-
-            # transform the data_list into the mapped value.
-            transformed_data_list = [lookup_dict.get(lookup_key) for lookup_key in field_data_array]
-                                
-            # loop through the table_key_dict and the lookup table. When a match is found add the new mapped key to
-            # the existing value of the table_key_dict in a new dict
-            converted_attributes_dict = {lookup_table_dict[key]: value
-                              for key, value in lookup_table_dict.items()}
-            
-            #===================================================================
-            # converted_dict = {}
-            # for keys, values in lookup_table_dict.items():
-            #     for map_key, map_value in lookup_dict.items():
-            #         if keys == map_key:
-            #             converted_dict[map_value] = lookup_table_dict[keys]
-            #===================================================================
-
-            return transformed_data_list, converted_attributes_dict
+            # Sort the lookup keys once per table and reuse across fields sharing the lookup
+            table_name = field_yml_settings_dict['lookup_table']
+            cached_lookup_index = self._lookup_index_cache.get(table_name)
+            if cached_lookup_index is None:
+                # Compare as strings so mismatched key/data types degrade to "no match" like dict.get did
+                keys_array = np.asarray([str(lookup_key) for lookup_key in lookup_table_dict.keys()])
+                sorter = np.argsort(keys_array)
+                cached_lookup_index = (keys_array, sorter)
+                self._lookup_index_cache[table_name] = cached_lookup_index
+            keys_array, sorter = cached_lookup_index
+
+            # get the array of foreign key values
+            field_data_array = np.asarray([str(field_datum) for field_datum in get_data(field_yml_settings_dict)])
+
+            # map each key to its zero-based index with one vectorised binary search
+            positions = np.clip(np.searchsorted(keys_array, field_data_array, sorter=sorter),
+                                0, len(keys_array) - 1)
+            key_indices = sorter[positions]
+            matched_mask = keys_array[key_indices] == field_data_array
+            transformed_data_array = np.where(matched_mask,
+                                              key_indices,
+                                              int(field_yml_settings_dict['fill_value'])
+                                              ).astype(field_yml_settings_dict['dtype'])
+
+            return transformed_data_array, lookup_table_dict
 
         def handle_key_value_for_ellipsoid_datum(field_yml_settings_dict):
             """
@@ -457,47 +571,16 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             logger.debug('- - - - - - - - - - - - - - - -')
 
             lookup_table_dict = {0: "GRS80"}
-            # get the keys into a list
-            lookup_key_list = [lookup_key for lookup_key in lookup_table_dict.keys()]
-
-            # create the lookup table to convert variables with strings as keys.
-            lookup_dict = {lookup_key: lookup_key_list.index(lookup_key)
-                           for lookup_key in lookup_key_list}
 
-            # get the array of numeric foreign key values
-            field_data_array = get_data(field_yml_settings_dict)
+            # get the array of datum values and map them to indices with one vectorised comparison
+            # (the old per-element loop also compared with "is", which never matched)
+            field_data_array = np.asarray([str(field_datum) for field_datum in get_data(field_yml_settings_dict)])
+            transformed_data_array = np.where(field_data_array == "GRS80",
+                                              0,
+                                              int(field_yml_settings_dict['fill_value'])
+                                              ).astype(field_yml_settings_dict['dtype'])
 
-
-
-            for i, value in enumerate(field_data_array):
-                    # print("i: {}".format(i))
-                    # print("value: {}".format(value))
-                if value is "GRS80":
-                    field_data_array[i] = 0
-                else:
-                    field_data_array[i] = int(field_yml_settings_dict['fill_value'])
-
-            #transformed_data_list
-            # transform the data_list into the mapped value.
-          #  transformed_data_list = [lookup_dict.get(lookup_key) for lookup_key in field_data_array]
-            # transformed_data_list = [lookup_dict.get(lookup_key) if lookup_key != field_yml_settings_dict['fill_value'] else field_yml_settings_dict['fill_value'] for lookup_key in field_data_array]
-           # print("transformed_data_list: {}".format(transformed_data_list))
-
-            # loop through the table_key_dict and the lookup table. When a match is found add the new mapped key to
-            # the existing value of the table_key_dict in a new dict
-
-            converted_attributes_dict = {lookup_table_dict[key]: value
-                                         for key, value in lookup_table_dict.items()}
-            print("converted_attributes_dict: {}".format(converted_attributes_dict))
-            # ===================================================================
-            # converted_dict = {}
-            # for keys, values in lookup_table_dict.items():
-            #     for map_key, map_value in lookup_dict.items():
-            #         if keys == map_key:
-            #             converted_dict[map_value] = lookup_table_dict[keys]
-            # ===================================================================
-
-            return field_data_array, converted_attributes_dict
+            return transformed_data_array, lookup_table_dict
 
 
         def get_field_description(target_field):
@@ -506,8 +589,8 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             :param target_field:
             :return field_description:
             """
-            sql_statement = self.sql_strings_dict_from_yaml['get_field_description'].format(target_field.upper())
-            self.cursor.execute(sql_statement)
+            sql_statement = self.sql_strings_dict_from_yaml['get_field_description']
+            self.cursor.execute(sql_statement, {'column_name': target_field.upper()})
             field_description = str(next(self.cursor)[0])
 
             return field_description
@@ -544,29 +627,13 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
                     # some key values are already int8 and don't need to be converted. Thus a flag is included in the
                     if value == 'lookup_table':
                         logger.debug('Converting ' + str(value) + 'string keys to int8 with 0 as 1st index')
-                        converted_data_list, converted_key_value_dict = handle_key_value_cases(field_yml_settings_dict,
+                        # unmatched keys already carry the fill value in the returned int array
+                        converted_data_array, converted_key_value_dict = handle_key_value_cases(field_yml_settings_dict,
                                                                     self.get_keys_and_values_table(field_yml_settings_dict.get('lookup_table')))
 
                         logger.debug('Adding converted lookup table as variable attribute...')
                         # this replaces ['comments'] values set in the previous if statement.
                         # attributes_dict['comments'] = str(converted_key_value_dict)
-                        #print('this format')
-                        # print('converted_data_list')
-                        # print(converted_data_list)
-                        print("before converted data list: {}".format(converted_data_list))
-                        print(converted_data_list[0])
-                        #if converted_data_list[0] == None:
-                        for i, value in enumerate(converted_data_list):
-                             # print("i: {}".format(i))
-                             # print("value: {}".format(value))
-                            if value is None:
-                                converted_data_list[i] = int(field_yml_settings_dict['fill_value'])
-                            else:
-                                converted_data_list[i] = value
-                        print("converted data list: {}".format(converted_data_list))
-
-
-                        converted_data_array = np.array(converted_data_list, field_yml_settings_dict['dtype'])
 
                     # for the one case where a column in the observation table (tcdem) needs to be added as the
                     # attribute of varaible in the netcdf file.
@@ -574,7 +641,8 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
                         # the grav datum needs to be converted from its key value
                         if field_yml_settings_dict.get('short_name') == 'Grav':
                             gravdatum_key = self.get_survey_wide_value_from_obs_table(field_yml_settings_dict.get(value))
-                            attributes_dict[value] = self.get_value_for_key("DESCRIPTION", "GRAVDATUMS", "GRAVDATUM", gravdatum_key)
+                            # look the description up in the cached reference table - no extra round trip
+                            attributes_dict[value] = self.get_keys_and_values_table("GRAVDATUMS").get(gravdatum_key)
                         # while TCDEM and ELLIPSOIDHGTDATUM do not
                         else:
                             attributes_dict[value] = self.get_survey_wide_value_from_obs_table(field_yml_settings_dict.get(value))
@@ -598,14 +666,13 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
 
             logger.debug('Attributes_dict' + str(attributes_dict))
 
-            # if the data array contained a lookup and was converted, return it and the attribute dict.
+            # if the data array contained a lookup and was converted, return it with its lookup dict
             if len(converted_data_array) > 0:
-                return converted_data_array, attributes_dict
+                return converted_data_array, attributes_dict, converted_key_value_dict
 
-            # else get the non converted data and return it in an numpy array and the and the attribute dict too
+            # else return the non converted typed data array
             else:
-                data_array = np.array(get_data(field_yml_settings_dict), dtype=field_yml_settings_dict['dtype'])
-                return data_array, attributes_dict
+                return get_data(field_yml_settings_dict), attributes_dict, None
 
         # ------------------------------------------------------------------------------------
         # Begin yielding NetCDFVariables
@@ -645,6 +712,9 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
         # The point dimension variables and their assocciated lookup table variables
         # ---------------------------------------------------------------------------
         
+        # One bulk SELECT covers every configured observation column for this survey
+        fetch_all_field_columns()
+
         # Loop through the defined variables in the yaml config and construct as netcdf variables.
         for field_name, field_value in Grav2NetCDFConverter.settings['field_names'].items():
             # convert strings to int or floats for int8 and float32 to get the required data type for the fill value
@@ -655,12 +725,16 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
             else:
                 fill_value = field_value['fill_value']
 
-            data, attributes = build_attribute_dict_and_data_list_of_variables(field_value)
+            data, attributes, lookup_table_dict = build_attribute_dict_and_data_list_of_variables(field_value)
+
+            # Size chunks from the element width so each chunk lands near _TARGET_CHUNK_BYTES,
+            # with whole-array chunks for surveys smaller than the target
+            point_chunk_size = min(self.point_count,
+                                   _TARGET_CHUNK_BYTES // np.dtype(field_value['dtype']).itemsize)
 
             if field_value.get('lookup_table'):
 
-                # get the values from the lookup table dict and convert into a np.array
-                lookup_table_dict = self.get_keys_and_values_table(field_value['lookup_table'])
+                # get the values from the lookup table dict returned with the data - no second fetch
                 grid_value_list = [value for value in iter(lookup_table_dict.values())]
                 lookup_table_array = np.array(grid_value_list)
                 attributes.pop('dtype', None)
@@ -668,12 +742,14 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
 
                 dim_name = field_value['short_name'].lower()
 
-                # Yield lookup table with same name as field
+                # Yield lookup table with same name as field. Lookup tables are re-read
+                # repeatedly downstream, so give them a generous per-variable chunk cache
                 yield NetCDFVariable(short_name=dim_name,
                                      data=lookup_table_array,
                                      dimensions=[dim_name],
                                      fill_value=fill_value,
-                                     attributes=attributes
+                                     attributes=attributes,
+                                     chunk_cache_bytes=16 * 1024 * 1024
                                      )
                 
                 # Yield index table with name of <field_name>_index 
@@ -685,17 +761,100 @@ class Grav2NetCDFConverter(ToNetCDFConverter):
                                      data=data,
                                      dimensions=['point'],
                                      fill_value=fill_value,
-                                     attributes=index_attributes
+                                     attributes=index_attributes,
+                                     chunk_size=point_chunk_size,
+                                     chunk_cache_bytes=1024 * 1024 # Single-pass write - keep the footprint small
                                      )
-                
+
             else: # Not a lookup field
+                # Quantize float32 fields to 4 decimal places so shuffle+zlib compress far
+                # better - survey quantities (um/s^2, metres) carry no more real precision.
+                # Lat/Long stay float64 and are written at full precision
+                variable_parameters = None
+                if field_value['dtype'] == 'float32':
+                    variable_parameters = dict(NetCDFVariable.DEFAULT_VARIABLE_PARAMETERS)
+                    variable_parameters['least_significant_digit'] = 4
+
                 yield NetCDFVariable(short_name=(field_value.get('standard_name') or field_value['short_name']).lower(),
                                      data=data,
                                      dimensions=['point'],
                                      fill_value=fill_value,
-                                     attributes=attributes
+                                     attributes=attributes,
+                                     chunk_size=point_chunk_size,
+                                     variable_parameters=variable_parameters,
+                                     chunk_cache_bytes=1024 * 1024 # Single-pass write - keep the footprint small
                                      )
 
+# Per-worker-process session pool built by _init_worker_session_pool
+_worker_session_pool = None
+
+
+def _init_worker_session_pool(oracle_database, u_id, pw):
+    """
+    ProcessPoolExecutor initializer to build one cx_Oracle session pool per worker
+    process, so successive surveys acquire warm connections instead of reconnecting.
+    """
+    global _worker_session_pool
+    _worker_session_pool = cx_Oracle.SessionPool(u_id, pw, oracle_database,
+                                                 min=1, max=2, increment=1, threaded=True)
+    # The same parameterised statements repeat for every survey - let the server
+    # reuse parsed cursors across surveys instead of re-parsing per query
+    _worker_session_pool.stmtcachesize = 50
+
+
+def _process_survey(args):
+    """
+    Convert a single survey to netCDF in a worker process. Connections come from the
+    worker's session pool (connections cannot be shared across process forks).
+    Returns a (survey, succeeded) tuple so one bad survey doesn't abort the run -
+    main() collects the failures for selective reprocessing.
+    """
+    survey, nc_out_file, oracle_database, u_id, pw, sql_strings_dict = args
+
+    logger.debug("Processing for survey: " + str(survey))
+    if _worker_session_pool is not None:
+        con = _worker_session_pool.acquire()
+    else: # Not running under the executor - fall back to a direct connection
+        con = cx_Oracle.connect(u_id, pw, oracle_database)
+    # Write to a temp file and rename on success so readers never see a partial .nc
+    temp_nc_out_file = nc_out_file + '.tmp'
+    try:
+        g2n = Grav2NetCDFConverter(temp_nc_out_file, survey, con, sql_strings_dict)
+
+        g2n.convert2netcdf()
+
+        if logger.isEnabledFor(logging.INFO):
+            # One structured record per survey in place of the multi-line dataset dump -
+            # a single logger call and a line that's easy to grep/parse from worker logs
+            nc_output_dataset = g2n.nc_output_dataset
+            summary = {'survey': str(survey),
+                       'file': nc_out_file,
+                       'attrs': {key: str(nc_output_dataset.getncattr(key))
+                                 for key in nc_output_dataset.ncattrs()},
+                       'dims': {dimension_name: len(dimension)
+                                for dimension_name, dimension in nc_output_dataset.dimensions.items()},
+                       'nvars': len(nc_output_dataset.variables)}
+            logger.info('survey_done %s', json.dumps(summary, default=str))
+
+        g2n.close() # Release the HDF5 chunk cache now rather than at garbage collection
+        del g2n
+        os.replace(temp_nc_out_file, nc_out_file) # Atomic on the same filesystem
+    except Exception:
+        logger.exception('Survey %s failed', survey)
+        try:
+            os.unlink(temp_nc_out_file)
+        except FileNotFoundError:
+            pass
+        return survey, False
+    finally:
+        if _worker_session_pool is not None:
+            _worker_session_pool.release(con)
+        else:
+            con.close()
+
+    return survey, True
+
+
 def main():
 
     # get user input and connect to oracle
@@ -704,7 +863,11 @@ def main():
     oracle_database = sys.argv[2]
     u_id = sys.argv[3]
     pw = sys.argv[4]
-    con = cx_Oracle.connect(u_id, pw, oracle_database)
+    # Acquire the connection from a session pool with statement caching so every survey's
+    # converter reuses the same parsed statements instead of paying the parse cost per cursor
+    pool = cx_Oracle.SessionPool(u_id, pw, oracle_database, min=1, max=4, increment=1, threaded=True)
+    con = pool.acquire()
+    con.stmtcachesize = 50
     survey_cursor = con.cursor()
 
     # get sql strings from yaml file
@@ -714,44 +877,43 @@ def main():
 
     survey_cursor.execute(sql_strings_dict['sql_get_surveyids'])
     
-    # tidy the survey id strings
-    survey_id_list = [re.search('\d+', survey_row[0]).group()
-                      for survey_row in survey_cursor
-                      ]
-
-    logger.debug('Survey count = {}'.format(len(survey_id_list)))
-    # Loop through he survey lists to make a netcdf file based off each one.
-    for survey in survey_id_list:
-        logger.debug("Processing for survey: " + str(survey))
-        if survey == "201901":
-            #try:
-            #g2n = Grav2NetCDFConverter(nc_out_path + "/" + "P" + str(survey) + '.nc', survey, con, sql_strings_dict)
-            # put a P in front of file names for consistency with other datasets. P for project.
-            g2n = Grav2NetCDFConverter("{0}/P{1}_GNDGRAV.nc".format(nc_out_path, str(survey)), survey, con, sql_strings_dict)
-
-            g2n.convert2netcdf()
-            logger.info('Finished writing netCDF file {}'.format(nc_out_path))
-            logger.info('-------------------------------------------------------------------')
-            logger.info('Global attributes:')
-            logger.info('-------------------------------------------------------------------')
-            for key, value in iter(g2n.nc_output_dataset.__dict__.items()):
-                logger.info(str(key) + ": " + str(value))
-            logger.info('-'*30)
-            logger.info('Dimensions:')
-            logger.info('-'*30)
-            logger.info(g2n.nc_output_dataset.dimensions)
-            logger.info('-'*30)
-            logger.info('Variables:')
-            logger.info('-'*30)
-            logger.info(g2n.nc_output_dataset.variables)
-
-            #print(g2n.nc_output_dataset.file_format)
-            #print(g2n.nc_output_dataset.variables[''])
-            #print(g2n.nc_output_dataset.variables)
-            # for data in g2n.nc_output_dataset.variables['Reliab lookup table']:
-            #     print(data)
-            del g2n
-            # except Exception as e:
+    # Stream the tidied survey id strings straight off the cursor - survey sets can run
+    # to tens of thousands of ids and never need materialising as a list
+    surveys_to_process = (_DIGITS_RE.search(survey_row[0]).group()
+                          for survey_row in survey_cursor
+                          )
+    surveys_to_process = (survey for survey in surveys_to_process if survey == "201901")
+
+    # put a P in front of file names for consistency with other datasets. P for project.
+    nc_out_file_template = os.path.join(nc_out_path, 'P{}_GNDGRAV.nc')
+
+    # Each survey is an independent query/assemble/write cycle, so convert them in
+    # parallel worker processes rather than serially on one core
+    survey_count = 0
+    failed_surveys = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                                initializer=_init_worker_session_pool,
+                                                initargs=(oracle_database, u_id, pw)) as executor:
+        survey_args = ((survey, nc_out_file_template.format(survey), oracle_database, u_id, pw, sql_strings_dict)
+                       for survey in surveys_to_process)
+        for survey_count, (survey, succeeded) in enumerate(executor.map(_process_survey, survey_args, chunksize=4), 1):
+            if not succeeded:
+                failed_surveys.append(survey)
+            if survey_count % 100 == 0:
+                logger.info('Processed %d surveys', survey_count)
+
+    logger.info('Processed %d surveys in total', survey_count)
+
+    # Record any failed surveys so a re-run only needs the failed subset
+    if failed_surveys:
+        failed_path = os.path.join(nc_out_path, 'failed_surveys.txt')
+        temp_failed_path = failed_path + '.tmp'
+        with open(temp_failed_path, 'w') as failed_file:
+            failed_file.write('\n'.join(failed_surveys) + '\n')
+        os.replace(temp_failed_path, failed_path) # Atomic - never leaves a partial list
+        logger.warning('%d survey(s) failed - ids written to %s', len(failed_surveys), failed_path)
+
+    pool.release(con)
 
 
 if __name__ == '__main__':